@@ -2,6 +2,7 @@ import pygame
 import random
 import os
 import math
+import argparse
 
 # Initialize
 pygame.init()
@@ -12,6 +13,12 @@ WIDTH, HEIGHT = 800, 400
 WIN = pygame.display.set_mode((WIDTH, HEIGHT))
 FPS = 60
 
+# Seed for obstacle spacing and spawning; None gives a different run every game.
+# Set it with --seed or the DINO_SEED environment variable. A seeded game
+# measures difficulty in frames rather than wall-clock time, so the same seed
+# always gives the same obstacles
+SEED = int(os.environ["DINO_SEED"]) if os.environ.get("DINO_SEED") else None
+
 # Colors
 WHITE = (255, 255, 255)
 RED = (255, 0, 0)
@@ -363,7 +370,9 @@ class Obstacle:
 # Difficulty Manager Class
 class DifficultyManager:
     """Manages game difficulty progression"""
-    def __init__(self):
+    def __init__(self, seed=None):
+        # Own random generator so a seed replays the same obstacle sequence
+        self.rng = random.Random(seed)
         self.initial_speed = 7
         self.max_speed = 15
         self.speed_increase_rate = 0.1  # Speed increase per second
@@ -389,6 +398,12 @@ class DifficultyManager:
             'mixed': 0.1
         }
         
+        self.reset()
+        
+    def reset(self, seed=None):
+        """Start a new obstacle sequence, reseeding the generator if a seed is given"""
+        if seed is not None:
+            self.rng.seed(seed)
         self.last_distance = self.preferred_distance
         self.consecutive_close = 0  # Track consecutive close obstacles
         self.consecutive_far = 0    # Track consecutive far obstacles
@@ -439,7 +454,7 @@ class DifficultyManager:
         total = sum(probabilities)
         probabilities = [p / total for p in probabilities]
         
-        return random.choices(patterns, weights=probabilities)[0]
+        return self.rng.choices(patterns, weights=probabilities)[0]
     
     def get_next_obstacle_distance(self, time_elapsed):
         """Calculate the distance for the next obstacle"""
@@ -447,10 +462,10 @@ class DifficultyManager:
         min_dist, max_dist = self.distance_patterns[pattern]
         
         # Add some randomness within the pattern range
-        base_distance = random.randint(min_dist, max_dist)
+        base_distance = self.rng.randint(min_dist, max_dist)
         
         # Apply small variations for more natural feel
-        variation = random.randint(-20, 20)
+        variation = self.rng.randint(-20, 20)
         final_distance = max(self.min_distance, base_distance + variation)
         
         # Update consecutive counters
@@ -492,7 +507,7 @@ def main():
     dino = Dinosaur()
     ai = DinosaurAI()
     game_state = GameState()
-    difficulty_manager = DifficultyManager()
+    difficulty_manager = DifficultyManager(SEED)
     obstacles = []
     score = 0
     font = pygame.font.SysFont(None, 36)
@@ -501,6 +516,7 @@ def main():
     
     # Time tracking
     start_time = pygame.time.get_ticks()
+    frame = 0
     
     def redraw():
         WIN.blit(BACKGROUND_IMAGE, (0, 0))
@@ -531,10 +547,14 @@ def main():
         WIN.fill(WHITE)
         
         # Calculate time elapsed
-        current_time = pygame.time.get_ticks()
-        time_elapsed = (current_time - start_time) / 1000.0  # Convert to seconds
+        if SEED is not None:
+            time_elapsed = frame / FPS  # frames played, independent of the real frame rate
+        else:
+            current_time = pygame.time.get_ticks()
+            time_elapsed = (current_time - start_time) / 1000.0  # Convert to seconds
 
         if not game_over:
+            frame += 1
             # Update game state with current time
             game_state.update(dino, obstacles, score, time_elapsed)
             
@@ -555,7 +575,7 @@ def main():
             # Spawn obstacles based on difficulty
             should_spawn, next_distance = difficulty_manager.should_spawn_obstacle(obstacles, time_elapsed)
             if should_spawn:
-                if random.randint(0, 2) > 0:  # 66% chance to spawn obstacle
+                if difficulty_manager.rng.randint(0, 2) > 0:  # 66% chance to spawn obstacle
                     current_speed = difficulty_manager.get_current_speed(time_elapsed)
                     new_obstacle = Obstacle(current_speed, next_distance)
                     obstacles.append(new_obstacle)
@@ -605,4 +625,8 @@ def main():
     pygame.quit()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dino Runner played by a rule-based AI")
+    parser.add_argument("--seed", type=int, default=SEED,
+                        help="replay the same obstacle sequence every game (default: DINO_SEED or unseeded)")
+    SEED = parser.parse_args().seed
     main()
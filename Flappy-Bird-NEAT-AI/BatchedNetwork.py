@@ -0,0 +1,137 @@
+import numpy as np
+from neat.graphs import feed_forward_layers
+
+
+def _clip(z, lo, hi):
+    return np.minimum(hi, np.maximum(lo, z))
+
+
+def _inv(z):
+    with np.errstate(divide='ignore', over='ignore'):
+        out = 1.0 / z
+    return np.where(np.isfinite(out), out, 0.0)
+
+
+# NumPy versions of the activation functions in neat.activations
+ACTIVATIONS = {
+    'sigmoid': lambda z: 1.0 / (1.0 + np.exp(-_clip(5.0 * z, -60.0, 60.0))),
+    'tanh': lambda z: np.tanh(_clip(2.5 * z, -60.0, 60.0)),
+    'sin': lambda z: np.sin(_clip(5.0 * z, -60.0, 60.0)),
+    'gauss': lambda z: np.exp(-5.0 * _clip(z, -3.4, 3.4) ** 2),
+    'relu': lambda z: np.where(z > 0.0, z, 0.0),
+    'softplus': lambda z: 0.2 * np.log(1 + np.exp(_clip(5.0 * z, -60.0, 60.0))),
+    'identity': lambda z: z,
+    'clamped': lambda z: _clip(z, -1.0, 1.0),
+    'inv': _inv,
+    'log': lambda z: np.log(np.maximum(1e-7, z)),
+    'exp': lambda z: np.exp(_clip(z, -60.0, 60.0)),
+    'abs': np.abs,
+    'hat': lambda z: np.maximum(0.0, 1 - np.abs(z)),
+    'square': lambda z: z ** 2,
+    'cube': lambda z: z ** 3,
+}
+
+
+class BatchedNetwork:
+    """A whole population of feed-forward NEAT networks evaluated at once.
+
+    Every genome is laid out on the same padded set of node slots (inputs
+    first, then outputs, then hidden nodes) and each feed-forward layer
+    becomes a (population, slots, slots) weight tensor, so one activate()
+    call runs every live agent through its own network with NumPy.
+    Only 'sum' aggregation is supported.
+    """
+
+    def __init__(self, num_inputs, output_slots, weights, biases, responses, layer_masks, act_masks):
+        self.num_inputs = num_inputs
+        self.output_slots = output_slots
+        self.weights = weights
+        self.biases = biases
+        self.responses = responses
+        self.layer_masks = layer_masks
+        self.act_masks = act_masks
+
+    def activate(self, inputs, rows=None):
+        """Evaluate the networks in rows (all genomes if None) on an (k, num_inputs) array.
+
+        Returns a (k, num_outputs) array of output values.
+        """
+        if rows is None:
+            rows = slice(None)
+        inputs = np.asarray(inputs, dtype=np.float64)
+        if inputs.ndim != 2 or inputs.shape[1] != self.num_inputs:
+            raise RuntimeError("Expected {0:n} inputs per agent, got shape {1}".format(self.num_inputs, inputs.shape))
+
+        values = np.zeros((inputs.shape[0], self.biases.shape[1]))
+        values[:, :self.num_inputs] = inputs
+        biases = self.biases[rows]
+        responses = self.responses[rows]
+        for weights, layer_mask in zip(self.weights, self.layer_masks):
+            # stacked matmul works row by row, so a row's result never depends on the batch
+            s = np.matmul(weights[rows], values[:, :, None])[:, :, 0]
+            z = biases + responses * s
+            if len(self.act_masks) == 1:
+                name, = self.act_masks
+                out = ACTIVATIONS[name](z)
+            else:
+                out = np.zeros_like(z)
+                for name, act_mask in self.act_masks.items():
+                    out = np.where(act_mask[rows], ACTIVATIONS[name](z), out)
+            values = np.where(layer_mask[rows], out, values)
+
+        return values[:, self.output_slots]
+
+    @staticmethod
+    def create(genomes, config):
+        """ Receives a list of genomes and returns their BatchedNetwork. """
+        genome_config = config.genome_config
+        input_keys = genome_config.input_keys
+        output_keys = genome_config.output_keys
+
+        # Lay out every genome's required nodes on shared slots.
+        plans = []
+        num_slots = len(input_keys) + len(output_keys)
+        num_layers = 0
+        for genome in genomes:
+            connections = [cg.key for cg in genome.connections.values() if cg.enabled]
+            layers = feed_forward_layers(input_keys, output_keys, connections)
+            slots = {key: i for i, key in enumerate(input_keys + output_keys)}
+            for layer in layers:
+                for node in sorted(layer):
+                    if node not in slots:
+                        slots[node] = len(slots)
+            plans.append((connections, layers, slots))
+            num_slots = max(num_slots, len(slots))
+            num_layers = max(num_layers, len(layers))
+
+        n = len(genomes)
+        weights = [np.zeros((n, num_slots, num_slots)) for _ in range(num_layers)]
+        layer_masks = [np.zeros((n, num_slots), dtype=bool) for _ in range(num_layers)]
+        biases = np.zeros((n, num_slots))
+        responses = np.ones((n, num_slots))
+        act_masks = {}
+
+        for row, (genome, (connections, layers, slots)) in enumerate(zip(genomes, plans)):
+            for depth, layer in enumerate(layers):
+                for node in layer:
+                    ng = genome.nodes[node]
+                    if ng.aggregation != 'sum':
+                        raise ValueError("Unsupported aggregation '{0}' for batched evaluation".format(ng.aggregation))
+                    if ng.activation not in ACTIVATIONS:
+                        raise ValueError("Unsupported activation '{0}' for batched evaluation".format(ng.activation))
+
+                    slot = slots[node]
+                    layer_masks[depth][row, slot] = True
+                    biases[row, slot] = ng.bias
+                    responses[row, slot] = ng.response
+                    if ng.activation not in act_masks:
+                        act_masks[ng.activation] = np.zeros((n, num_slots), dtype=bool)
+                    act_masks[ng.activation][row, slot] = True
+
+                    for inode, onode in connections:
+                        if onode == node:
+                            cg = genome.connections[(inode, onode)]
+                            weights[depth][row, slot, slots[inode]] = cg.weight
+
+        output_slots = list(range(len(input_keys), len(input_keys) + len(output_keys)))
+        return BatchedNetwork(len(input_keys), output_slots, weights, biases, responses, layer_masks, act_masks)
@@ -0,0 +1,216 @@
+import random
+import time
+import numpy as np
+from FlappySim import (Bird, Pipe, Base, WIN_WIDTH, FLOOR, BIRD_HEIGHT, BIRD_WIDTH, PIPE_WIDTH, PIPE_HEIGHT,
+                       BIRD_SPANS, PIPE_TOP_SPANS, PIPE_BOTTOM_SPANS)
+
+# The FlappySim row spans as arrays: (frame, row, left/right) and (row, left/right)
+BIRD_SPAN_ARRAY = np.array(BIRD_SPANS)
+PIPE_TOP_SPAN_ARRAY = np.array(PIPE_TOP_SPANS)
+PIPE_BOTTOM_SPAN_ARRAY = np.array(PIPE_BOTTOM_SPANS)
+BIRD_ROWS = np.arange(BIRD_HEIGHT)
+
+
+class BirdPopulation:
+    """A whole flock of FlappySim birds stored as one NumPy array per field.
+
+    Bird i is row i of every array. Birds never leave the arrays; a crash
+    only clears alive[i], and every step works on the live rows at once.
+    The physics and animation are the same as FlappySim.Bird's, bird for
+    bird, so either can be used to train the same genomes.
+    """
+
+    def __init__(self, size, x, y):
+        # every bird flies in the same column
+        self.x = x
+        self.y = np.full(size, y, dtype=np.float64)
+        self.vel = np.zeros(size, dtype=np.float64)
+        self.tick_count = np.zeros(size, dtype=np.int64)
+        self.tilt = np.zeros(size, dtype=np.int64)
+        self.height = self.y.copy()
+        self.img_count = np.zeros(size, dtype=np.int64)
+        self.img_index = np.zeros(size, dtype=np.int64)
+        self.alive = np.ones(size, dtype=bool)
+
+    def __len__(self):
+        return len(self.alive)
+
+    def indices(self):
+        return np.flatnonzero(self.alive)
+
+    def jump(self, indices):
+        self.vel[indices] = -10.5
+        self.tick_count[indices] = 0
+        self.height[indices] = self.y[indices]
+
+    def move(self):
+        i = self.indices()
+        tick_count = self.tick_count[i] + 1
+        displacement = self.vel[i] * tick_count + 0.5 * 3 * tick_count ** 2
+        displacement = np.where(displacement >= 16, 16, displacement)
+        displacement = np.where(displacement < 0, displacement - 2, displacement)
+        y = self.y[i] + displacement
+
+        tilt = self.tilt[i]
+        climbing = (displacement < 0) | (y < self.height[i] + 50)
+        tilt = np.where(climbing, np.maximum(tilt, Bird.MAX_ROTATION),
+                        np.where(tilt > -90, tilt - Bird.ROT_VEL, tilt))
+
+        self.tick_count[i] = tick_count
+        self.y[i] = y
+        self.tilt[i] = tilt
+
+    def animate(self):
+        # same frame sequence as FlappySim.Bird.animate
+        i = self.indices()
+        img_count = self.img_count[i] + 1
+        step = Bird.ANIMATION_TIME
+        img_index = np.select([img_count <= step, img_count <= step * 2, img_count <= step * 3,
+                               img_count <= step * 4, img_count == step * 4 + 1],
+                              [0, 1, 2, 1, 0], self.img_index[i])
+        img_count = np.where(img_count == step * 4 + 1, 0, img_count)
+
+        diving = self.tilt[i] <= -80
+        self.img_index[i] = np.where(diving, 1, img_index)
+        self.img_count[i] = np.where(diving, step * 2, img_count)
+
+    def collide(self, pipe):
+        """Indices of live birds overlapping pipe, by the FlappySim sprite spans."""
+        if self.x + BIRD_WIDTH <= pipe.x or pipe.x + PIPE_WIDTH <= self.x:
+            return np.empty(0, dtype=np.int64)
+        i = self.indices()
+        bird_y = np.round(self.y[i]).astype(np.int64)
+        # only birds reaching above the gap or below it can touch the pipe
+        near = (bird_y < pipe.height) | (bird_y + BIRD_HEIGHT > pipe.bottom)
+        i, bird_y = i[near], bird_y[near]
+
+        rows = bird_y[:, None] + BIRD_ROWS
+        spans = BIRD_SPAN_ARRAY[self.img_index[i]]
+        left = spans[:, :, 0] + self.x
+        right = spans[:, :, 1] + self.x
+        hit = np.zeros(len(i), dtype=bool)
+        for pipe_y, pipe_spans in ((pipe.top, PIPE_TOP_SPAN_ARRAY), (pipe.bottom, PIPE_BOTTOM_SPAN_ARRAY)):
+            inside = (rows >= pipe_y) & (rows < pipe_y + PIPE_HEIGHT)
+            pipe_rows = pipe_spans[np.clip(rows - pipe_y, 0, PIPE_HEIGHT - 1)]
+            overlap = (left <= pipe_rows[:, :, 1] + pipe.x) & (pipe_rows[:, :, 0] + pipe.x <= right)
+            hit |= (inside & overlap).any(axis=1)
+        return i[hit]
+
+    def out_of_bounds(self):
+        """Indices of live birds that hit the floor or flew off the top."""
+        i = self.indices()
+        y = self.y[i]
+        return i[(y + BIRD_HEIGHT - 10 >= FLOOR) | (y < -50)]
+
+    def kill(self, indices):
+        self.alive[indices] = False
+
+    def bird(self, index, bird_type=Bird):
+        """A bird_type object copying bird index, e.g. to draw it."""
+        bird = bird_type(self.x, float(self.y[index]))
+        bird.tilt = int(self.tilt[index])
+        bird.img_index = int(self.img_index[index])
+        bird.index = int(index)
+        return bird
+
+
+class PopulationSim:
+    """FlappySim with the flock held in a BirdPopulation.
+
+    Same frame, scoring and fitness as FlappySim, but observations() and
+    fitness are NumPy arrays and advance() takes one jump flag per live
+    bird as an array, so a generation of thousands of birds costs a few
+    array operations per frame rather than thousands of method calls.
+    Pipes and the base are still FlappySim objects, there are only a few.
+    """
+
+    BIRD_X = 230
+    BIRD_Y = 350
+
+    def __init__(self, num_birds, seed=None, game_speed=5, pipe_type=Pipe, base_type=Base):
+        self.game_speed = game_speed
+        self.pipe_type = pipe_type
+        self.rng = random.Random(seed)
+        self.population = BirdPopulation(num_birds, self.BIRD_X, self.BIRD_Y)
+        self.fitness = np.zeros(num_birds)
+        self.pipes = [pipe_type(700, self.rng)]
+        self.base = base_type(FLOOR)
+        self.score = 0
+        self.frame = 0
+
+    def alive(self):
+        return self.population.indices()
+
+    def move_birds(self):
+        self.frame += 1
+        pipe_ind = 0
+        if len(self.pipes) > 1 and self.BIRD_X > self.pipes[0].x + PIPE_WIDTH:
+            pipe_ind = 1
+
+        self.fitness[self.population.alive] += 0.1
+        self.population.move()
+        return pipe_ind
+
+    def observations(self, pipe_ind):
+        pipe = self.pipes[pipe_ind]
+        y = self.population.y[self.population.alive]
+        return np.column_stack((y, np.abs(y - pipe.height), np.abs(y - pipe.bottom)))
+
+    def advance(self, jumps):
+        """Apply one jump flag per live bird and finish the frame.
+
+        Returns the indices of the birds that crashed into a pipe this frame.
+        """
+        population = self.population
+        population.jump(self.alive()[np.asarray(jumps, dtype=bool)])
+
+        self.base.move(self.game_speed)
+
+        crashed = []
+        rem = []
+        add_pipe = False
+        for pipe in self.pipes:
+            pipe.move(self.game_speed)
+
+            hit = population.collide(pipe)
+            if len(hit):
+                self.fitness[hit] -= 1
+                population.kill(hit)
+                crashed.append(hit)
+
+            if pipe.x + PIPE_WIDTH < 0:
+                rem.append(pipe)
+
+            if not pipe.passed and pipe.x < self.BIRD_X:
+                pipe.passed = True
+                add_pipe = True
+
+        if add_pipe:
+            self.score += 1
+            self.fitness[population.alive] += 5
+            self.pipes.append(self.pipe_type(WIN_WIDTH, self.rng))
+
+        for r in rem:
+            self.pipes.remove(r)
+
+        population.kill(population.out_of_bounds())
+        population.animate()
+        return np.concatenate(crashed) if crashed else np.empty(0, dtype=np.int64)
+
+
+def benchmark(num_birds=10000, frames=2000, seed=0):
+    # random flappers, restarted whenever the whole flock is gone
+    rng = np.random.default_rng(seed)
+    sim = PopulationSim(num_birds, seed=seed)
+    start = time.perf_counter()
+    for _ in range(frames):
+        if not sim.population.alive.any():
+            sim = PopulationSim(num_birds, seed=seed)
+        sim.move_birds()
+        sim.advance(rng.random(len(sim.alive())) < 0.1)
+    elapsed = time.perf_counter() - start
+    print(f"{frames / elapsed:,.0f} frames/s with up to {num_birds} birds")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -1,10 +1,15 @@
 import pygame
-import random
 import os
 import time
 import neat
 import matplotlib.pyplot as plt
 import threading
+import functools
+from BatchedNetwork import BatchedNetwork
+from RenderPolicy import RenderPolicy
+import FlappySim as sim
+from BirdPopulation import PopulationSim
+from ShardedEvaluator import ShardedEvaluator
 
 pygame.init() 
 
@@ -15,6 +20,27 @@ STAT_FONT = pygame.font.SysFont("comicsans", 50)
 END_FONT = pygame.font.SysFont("comicsans", 70)
 DRAW_LINES = False
 HIGH_SCORE_FILE = "high_score.txt"
+# Every generation flies through the same pipe heights; None for a fresh sequence each time
+PIPE_SEED = None
+# What gets drawn: "never", "every_n" (all birds every RENDER_EVERY-th frame),
+# "best" (the previous generation's best genome) or "first_k" (the first
+# RENDER_FIRST_K live birds). Keys 0-3 in the window, or 0-3 and Enter in the
+# terminal, switch between them; undrawn frames run uncapped
+RENDER_MODE = "every_n"
+RENDER_EVERY = 1
+RENDER_FIRST_K = 5
+render_policy = RenderPolicy(RENDER_MODE, RENDER_EVERY, RENDER_FIRST_K, fps=30)
+# Key of the best genome of the previous generation, shown by the "best" policy;
+# live birds all share one fitness, so the current generation cannot tell
+best_genome_id = None
+# "single" flies the whole generation in this process with rendering, "sharded"
+# splits the birds over NUM_WORKERS headless processes that all fly the same
+# pipes, for the same fitness. Sharded workers are started with
+# SHARD_START_METHOD and re-import this script, so nothing above the
+# __main__ guard may open the window (see open_window)
+EVAL_MODE = "single"
+NUM_WORKERS = os.cpu_count()
+SHARD_START_METHOD = "spawn"
 
 try:
     with open(HIGH_SCORE_FILE, "r") as file:
@@ -23,152 +49,76 @@ except Exception as e:
     print("Error reading high score file:", e)
     high_score = 0
 
-WIN = pygame.display.set_mode((WIN_WIDTH, WIN_HEIGHT))
-pygame.display.set_caption("Flappy Bird")
-pipe_img = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "pipe.png")).convert_alpha())
-bg_img = pygame.transform.scale(pygame.image.load(os.path.join("imgs", "bg.png")).convert_alpha(), (600, 900))
+# Opened by open_window() for the first drawn frame, so "never" runs stay headless
+WIN = None
+# Plain loads need no display; open_window() converts them for faster blits
+pipe_img = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "pipe.png")))
+bg_img = pygame.transform.scale(pygame.image.load(os.path.join("imgs", "bg.png")), (600, 900))
 bird_images = [pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", f"bird{x}.png"))) for x in range(1, 4)]
-base_img = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "base.png")).convert_alpha())
+base_img = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "base.png")))
 
 gen = 0
 
-class Bird:
-    MAX_ROTATION = 25
+# The physics lives in FlappySim; these subclasses only add the sprites
+class Bird(sim.Bird):
     IMGS = bird_images
-    ROT_VEL = 20
-    ANIMATION_TIME = 5
-
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.tilt = 0
-        self.tick_count = 0
-        self.vel = 0
-        self.height = self.y
-        self.img_count = 0
-        self.img = self.IMGS[0]
-
-    def jump(self):
-        self.vel = -10.5
-        self.tick_count = 0
-        self.height = self.y
-
-    def move(self):
-        self.tick_count += 1
-        displacement = self.vel * (self.tick_count) + 0.5 * (3) * (self.tick_count) ** 2
-
-        if displacement >= 16:
-            displacement = (displacement / abs(displacement)) * 16
-
-        if displacement < 0:
-            displacement -= 2
-
-        self.y = self.y + displacement
-
-        if displacement < 0 or self.y < self.height + 50:
-            if self.tilt < self.MAX_ROTATION:
-                self.tilt = self.MAX_ROTATION
-        else:
-            if self.tilt > -90:
-                self.tilt -= self.ROT_VEL
+    # (img_index, tilt) -> rotated sprite and its offset; tilt only takes a
+    # few values, so each rotation is done once for every bird
+    ROTATED = {}
 
-    def draw(self, win):
-        self.img_count += 1
-        if self.img_count <= self.ANIMATION_TIME:
-            self.img = self.IMGS[0]
-        elif self.img_count <= self.ANIMATION_TIME * 2:
-            self.img = self.IMGS[1]
-        elif self.img_count <= self.ANIMATION_TIME * 3:
-            self.img = self.IMGS[2]
-        elif self.img_count <= self.ANIMATION_TIME * 4:
-            self.img = self.IMGS[1]
-        elif self.img_count == self.ANIMATION_TIME * 4 + 1:
-            self.img = self.IMGS[0]
-            self.img_count = 0
-
-        if self.tilt <= -80:
-            self.img = self.IMGS[1]
-            self.img_count = self.ANIMATION_TIME * 2
-
-        blitRotateCenter(win, self.img, (self.x, self.y), self.tilt)
-
-    def get_mask(self):
-        return pygame.mask.from_surface(self.img)
-
-
-class Pipe:
-    GAP = 200
-    VEL = 5
-
-    def __init__(self, x):
-        self.x = x
-        self.height = 0
-        self.top = 0
-        self.bottom = 0
-        self.PIPE_TOP = pygame.transform.flip(pipe_img, False, True)
-        self.PIPE_BOTTOM = pipe_img
-        self.passed = False
-        self.set_height()
-
-    def set_height(self):
-        self.height = random.randrange(50, 450)
-        self.top = self.height - self.PIPE_TOP.get_height()
-        self.bottom = self.height + self.GAP
-
-    def move(self, game_speed):
-        self.x -= game_speed
+    @property
+    def img(self):
+        return self.IMGS[self.img_index]
 
     def draw(self, win):
-        win.blit(self.PIPE_TOP, (self.x, self.top))
-        win.blit(self.PIPE_BOTTOM, (self.x, self.bottom))
-
-    def collide(self, bird, win):
-        bird_mask = bird.get_mask()
-        top_mask = pygame.mask.from_surface(self.PIPE_TOP)
-        bottom_mask = pygame.mask.from_surface(self.PIPE_BOTTOM)
-        top_offset = (self.x - bird.x, self.top - round(bird.y))
-        bottom_offset = (self.x - bird.x, self.bottom - round(bird.y))
+        key = (self.img_index, self.tilt)
+        if key not in self.ROTATED:
+            self.ROTATED[key] = rotateCenter(self.img, self.tilt)
+        rotated_image, (dx, dy) = self.ROTATED[key]
+        rect = self.img.get_rect(topleft=(self.x, self.y))
+        win.blit(rotated_image, (rect.x + dx, rect.y + dy))
 
-        b_point = bird_mask.overlap(bottom_mask, bottom_offset)
-        t_point = bird_mask.overlap(top_mask, top_offset)
 
-        if b_point or t_point:
-            return True
+class Pipe(sim.Pipe):
+    PIPE_TOP = pygame.transform.flip(pipe_img, False, True)
+    PIPE_BOTTOM = pipe_img
 
-        return False
+    def draw(self, win):
+        win.blit(self.PIPE_TOP, (self.x, self.top))
+        win.blit(self.PIPE_BOTTOM, (self.x, self.bottom))
 
 
-class Base:
-    VEL = 5
-    WIDTH = base_img.get_width()
+class Base(sim.Base):
     IMG = base_img
 
-    def __init__(self, y):
-        self.y = y
-        self.x1 = 0
-        self.x2 = self.WIDTH
-
-    def move(self, game_speed):
-        self.x1 -= game_speed
-        self.x2 -= game_speed
-        if self.x1 + self.WIDTH < 0:
-            self.x1 = self.x2 + self.WIDTH
-
-        if self.x2 + self.WIDTH < 0:
-            self.x2 = self.x1 + self.WIDTH
-
     def draw(self, win):
         win.blit(self.IMG, (self.x1, self.y))
         win.blit(self.IMG, (self.x2, self.y))
 
 
-def blitRotateCenter(surf, image, topleft, angle):
+def open_window():
+    global WIN, bg_img
+    if WIN is None:
+        WIN = pygame.display.set_mode((WIN_WIDTH, WIN_HEIGHT))
+        pygame.display.set_caption("Flappy Bird")
+        bg_img = bg_img.convert_alpha()
+        Pipe.PIPE_TOP = Pipe.PIPE_TOP.convert_alpha()
+        Pipe.PIPE_BOTTOM = Pipe.PIPE_BOTTOM.convert_alpha()
+        Base.IMG = Base.IMG.convert_alpha()
+    return WIN
+
+
+def rotateCenter(image, angle):
+    # the rotated image and its top-left relative to the unrotated image's
     rotated_image = pygame.transform.rotate(image, angle)
-    new_rect = rotated_image.get_rect(center=image.get_rect(topleft=topleft).center)
-    surf.blit(rotated_image, new_rect.topleft)
+    new_rect = rotated_image.get_rect(center=image.get_rect().center)
+    return rotated_image, new_rect.topleft
 
 
-def draw_window(win, birds, pipes, base, score, gen, pipe_ind, high_score):
+def draw_window(win, birds, pipes, base, score, gen, pipe_ind, high_score, shown=None):
+    # shown: the birds to draw, all of them by default; "Alive" still counts every bird
+    if shown is None:
+        shown = birds
     if gen == 0:
         gen = 1
     win.blit(bg_img, (0, 0))
@@ -177,7 +127,7 @@ def draw_window(win, birds, pipes, base, score, gen, pipe_ind, high_score):
         pipe.draw(win)
 
     base.draw(win)
-    for bird in birds:
+    for bird in shown:
 
         if DRAW_LINES:
             try:
@@ -206,96 +156,50 @@ def draw_window(win, birds, pipes, base, score, gen, pipe_ind, high_score):
 
 
 def eval_genomes(genomes, config):
-    global WIN, gen, high_score
-    win = WIN
+    global gen, high_score, best_genome_id
     gen += 1
 
-    game_speed = 5
-
-    nets = []
-    birds = []
-    ge = []
     for genome_id, genome in genomes:
         genome.fitness = 0
-        net = neat.nn.FeedForwardNetwork.create(genome, config)
-        nets.append(net)
-        birds.append(Bird(230, 350))
-        ge.append(genome)
-
-    base = Base(FLOOR)
-    pipes = [Pipe(700)]
-    score = 0
 
-    clock = pygame.time.Clock()
+    # one batched network for the population; network row i drives bird i
+    net = BatchedNetwork.create([genome for _, genome in genomes], config)
+    game = PopulationSim(len(genomes), seed=PIPE_SEED, pipe_type=Pipe, base_type=Base)
 
     run = True
-    while run and len(birds) > 0:
-        clock.tick(30)
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                run = False
-                pygame.quit()
-                quit()
-                break
-
-        pipe_ind = 0
-        if len(birds) > 0:
-            if len(pipes) > 1 and birds[0].x > pipes[0].x + pipes[0].PIPE_TOP.get_width():
-                pipe_ind = 1
-
-        for x, bird in enumerate(birds):
-            ge[x].fitness += 0.1
-            bird.move()
-
-            output = nets[birds.index(bird)].activate(
-                (bird.y, abs(bird.y - pipes[pipe_ind].height), abs(bird.y - pipes[pipe_ind].bottom)))
-
-            if output[0] > 0.5:
-                bird.jump()
-
-        base.move(game_speed)
-
-        rem = []
-        add_pipe = False
-        for pipe in pipes:
-            pipe.move(game_speed)
-
-            for bird in birds:
-                if pipe.collide(bird, win):
-                    ge[birds.index(bird)].fitness -= 1
-                    nets.pop(birds.index(bird))
-                    ge.pop(birds.index(bird))
-                    birds.pop(birds.index(bird))
-
-            if pipe.x + pipe.PIPE_TOP.get_width() < 0:
-                rem.append(pipe)
-
-            if not pipe.passed and pipe.x < bird.x:
-                pipe.passed = True
-                add_pipe = True
-
-        if add_pipe:
-            score += 1
-
-            for genome in ge:
-                genome.fitness += 5
-            pipes.append(Pipe(WIN_WIDTH))
-
-        for r in rem:
-            pipes.remove(r)
+    while run and game.population.alive.any():
+        render_policy.handle_events()
+
+        pipe_ind = game.move_birds()
+        outputs = net.activate(game.observations(pipe_ind), game.alive())
+        game.advance(outputs[:, 0] > 0.5)
+
+        # drawing is a layer on top of the simulation, only on the policy's frames
+        alive = game.alive()
+        if len(alive) and render_policy.frame_due(game.frame):
+            shown = [game.population.bird(index, Bird) for i, index in enumerate(alive)
+                     if render_policy.agent_visible(i, genomes[index][0] == best_genome_id)]
+            draw_window(open_window(), alive, game.pipes, game.base, game.score, gen, pipe_ind, high_score, shown)
+            render_policy.tick()
+
+    for (genome_id, genome), fitness in zip(genomes, game.fitness):
+        genome.fitness = float(fitness)
+    best_genome_id = max(genomes, key=lambda item: item[1].fitness)[0]
+
+    if game.score > high_score:
+        high_score = game.score
+    
+    return game.score
 
-        for bird in birds:
-            if bird.y + bird.img.get_height() - 10 >= FLOOR or bird.y < -50:
-                nets.pop(birds.index(bird))
-                ge.pop(birds.index(bird))
-                birds.pop(birds.index(bird))
 
-        draw_window(WIN, birds, pipes, base, score, gen, pipe_ind, high_score)
+def eval_genomes_sharded(evaluator, genomes, config):
+    global gen, high_score
+    gen += 1
 
+    score = evaluator.evaluate(genomes, config, PIPE_SEED)
     if score > high_score:
         high_score = score
-    
+
     return score
 
 
@@ -320,10 +224,21 @@ def run(config_file):
     stats = neat.StatisticsReporter()
     p.add_reporter(stats)
 
+    evaluator = None
+    if EVAL_MODE == "sharded":
+        evaluator = ShardedEvaluator(NUM_WORKERS, SHARD_START_METHOD)
+        evaluate = functools.partial(eval_genomes_sharded, evaluator)
+    else:
+        evaluate = eval_genomes
+
     plot_thread = threading.Thread(target=plot_scores, args=(stats,))
     plot_thread.start()
 
-    winner = p.run(eval_genomes, 2)
+    try:
+        winner = p.run(evaluate, 2)
+    finally:
+        if evaluator is not None:
+            evaluator.close()
 
     print('\nBest genome:\n{!s}'.format(winner))
 
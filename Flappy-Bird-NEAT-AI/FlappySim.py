@@ -0,0 +1,282 @@
+import random
+import time
+
+# Screen and sprite geometry, matching the scale2x images FlappyBirdAI-NEAT.py draws
+WIN_WIDTH = 600
+FLOOR = 730
+BIRD_WIDTH = 68
+BIRD_HEIGHT = 48
+PIPE_WIDTH = 104
+PIPE_HEIGHT = 640
+BASE_WIDTH = 672
+
+# Opaque pixels of bird1.png, bird2.png and bird3.png as the (first, last)
+# column of each row. Every row of the sprites is a single solid run, so
+# comparing these spans finds exactly the overlaps pygame masks would.
+BIRD_SPANS = [
+    [
+        (24, 47), (24, 47), (24, 47), (23, 48), (17, 50), (16, 51), (16, 51), (15, 52),
+        (13, 54), (12, 55), (12, 55), (11, 56), (5, 58), (4, 59), (4, 59), (3, 59),
+        (0, 59), (0, 59), (0, 59), (0, 59), (0, 59), (0, 59), (0, 59), (0, 60),
+        (0, 62), (0, 63), (0, 63), (0, 64), (3, 67), (4, 67), (4, 67), (5, 67),
+        (7, 64), (8, 63), (8, 63), (8, 63), (8, 63), (8, 63), (8, 63), (9, 62),
+        (11, 60), (12, 59), (12, 59), (13, 58), (19, 40), (20, 39), (20, 39), (20, 39),
+    ],
+    [
+        (24, 47), (24, 47), (24, 47), (23, 48), (17, 50), (16, 51), (16, 51), (15, 52),
+        (13, 54), (12, 55), (12, 55), (11, 56), (9, 58), (8, 59), (8, 59), (7, 59),
+        (5, 59), (4, 59), (4, 59), (4, 59), (4, 59), (4, 59), (4, 59), (3, 60),
+        (0, 62), (0, 63), (0, 63), (0, 64), (0, 67), (0, 67), (0, 67), (0, 67),
+        (3, 64), (4, 63), (4, 63), (5, 63), (7, 63), (8, 63), (8, 63), (9, 62),
+        (11, 60), (12, 59), (12, 59), (13, 58), (19, 40), (20, 39), (20, 39), (20, 39),
+    ],
+    [
+        (24, 47), (24, 47), (24, 47), (23, 48), (17, 50), (16, 51), (16, 51), (15, 52),
+        (13, 54), (12, 55), (12, 55), (11, 56), (9, 58), (8, 59), (8, 59), (7, 59),
+        (5, 59), (4, 59), (4, 59), (4, 59), (4, 59), (4, 59), (4, 59), (4, 60),
+        (4, 62), (4, 63), (4, 63), (3, 64), (0, 67), (0, 67), (0, 67), (0, 67),
+        (0, 64), (0, 63), (0, 63), (0, 63), (0, 63), (0, 63), (0, 63), (0, 62),
+        (3, 60), (4, 59), (4, 59), (5, 58), (19, 40), (20, 39), (20, 39), (20, 39),
+    ],
+]
+# pipe.png: a full-width cap, one bevelled row, then the narrower stem
+PIPE_BOTTOM_SPANS = [(0, 103)] * 48 + [(3, 100)] + [(4, 99)] * 591
+PIPE_TOP_SPANS = PIPE_BOTTOM_SPANS[::-1]
+
+
+def spans_overlap(spans_a, ax, ay, spans_b, bx, by):
+    """True if two sprites given as row spans share a pixel at these positions."""
+    for y in range(max(ay, by), min(ay + len(spans_a), by + len(spans_b))):
+        a_left, a_right = spans_a[y - ay]
+        b_left, b_right = spans_b[y - by]
+        if a_left + ax <= b_right + bx and b_left + bx <= a_right + ax:
+            return True
+    return False
+
+
+class Bird:
+    MAX_ROTATION = 25
+    ROT_VEL = 20
+    ANIMATION_TIME = 5
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.tilt = 0
+        self.tick_count = 0
+        self.vel = 0
+        self.height = self.y
+        self.img_count = 0
+        # animation frame, also used for collisions: 0, 1 or 2
+        self.img_index = 0
+
+    def jump(self):
+        self.vel = -10.5
+        self.tick_count = 0
+        self.height = self.y
+
+    def move(self):
+        self.tick_count += 1
+        displacement = self.vel * (self.tick_count) + 0.5 * (3) * (self.tick_count) ** 2
+
+        if displacement >= 16:
+            displacement = (displacement / abs(displacement)) * 16
+
+        if displacement < 0:
+            displacement -= 2
+
+        self.y = self.y + displacement
+
+        if displacement < 0 or self.y < self.height + 50:
+            if self.tilt < self.MAX_ROTATION:
+                self.tilt = self.MAX_ROTATION
+        else:
+            if self.tilt > -90:
+                self.tilt -= self.ROT_VEL
+
+    def animate(self):
+        # flap through frames 0, 1, 2, 1 and hold the level-wing frame in a dive
+        self.img_count += 1
+        if self.img_count <= self.ANIMATION_TIME:
+            self.img_index = 0
+        elif self.img_count <= self.ANIMATION_TIME * 2:
+            self.img_index = 1
+        elif self.img_count <= self.ANIMATION_TIME * 3:
+            self.img_index = 2
+        elif self.img_count <= self.ANIMATION_TIME * 4:
+            self.img_index = 1
+        elif self.img_count == self.ANIMATION_TIME * 4 + 1:
+            self.img_index = 0
+            self.img_count = 0
+
+        if self.tilt <= -80:
+            self.img_index = 1
+            self.img_count = self.ANIMATION_TIME * 2
+
+
+class Pipe:
+    GAP = 200
+    VEL = 5
+
+    def __init__(self, x, rng=None):
+        self.x = x
+        # pipes sharing one seeded random.Random come in a repeatable sequence
+        self.rng = rng if rng is not None else random
+        self.height = 0
+        self.top = 0
+        self.bottom = 0
+        self.passed = False
+        self.set_height()
+
+    def set_height(self):
+        self.height = self.rng.randrange(50, 450)
+        self.top = self.height - PIPE_HEIGHT
+        self.bottom = self.height + self.GAP
+
+    def move(self, game_speed):
+        self.x -= game_speed
+
+    def collide(self, bird):
+        bird_y = round(bird.y)
+        # broad phase: nothing can touch unless the columns overlap, and
+        # the bird can only reach one pipe half unless it spans the gap
+        if bird.x + BIRD_WIDTH <= self.x or self.x + PIPE_WIDTH <= bird.x:
+            return False
+        spans = BIRD_SPANS[bird.img_index]
+        if bird_y < self.height and spans_overlap(spans, bird.x, bird_y, PIPE_TOP_SPANS, self.x, self.top):
+            return True
+        if bird_y + BIRD_HEIGHT > self.bottom and spans_overlap(spans, bird.x, bird_y, PIPE_BOTTOM_SPANS, self.x, self.bottom):
+            return True
+        return False
+
+
+class Base:
+    VEL = 5
+    WIDTH = BASE_WIDTH
+
+    def __init__(self, y):
+        self.y = y
+        self.x1 = 0
+        self.x2 = self.WIDTH
+
+    def move(self, game_speed):
+        self.x1 -= game_speed
+        self.x2 -= game_speed
+        if self.x1 + self.WIDTH < 0:
+            self.x1 = self.x2 + self.WIDTH
+
+        if self.x2 + self.WIDTH < 0:
+            self.x2 = self.x1 + self.WIDTH
+
+
+class FlappySim:
+    """One round of Flappy Bird for a whole flock, with no display, images or frame cap.
+
+    A frame is split in two so a controller can act in between:
+    move_birds() advances the birds and returns the index of the pipe
+    ahead, observations() gives the network inputs, and advance(jumps)
+    applies the jumps, scrolls the world and removes birds that crashed.
+    fitness[i] follows the NEAT shaping of bird i: +0.1 per frame alive,
+    +5 per pipe passed and -1 for hitting a pipe.
+
+    The game passes its drawable Bird/Pipe/Base subclasses in to render
+    on top of the same state; headless runs use the classes here.
+    """
+
+    BIRD_X = 230
+    BIRD_Y = 350
+
+    def __init__(self, num_birds, seed=None, game_speed=5, bird_type=Bird, pipe_type=Pipe, base_type=Base):
+        self.game_speed = game_speed
+        self.pipe_type = pipe_type
+        self.rng = random.Random(seed)
+        self.birds = []
+        for i in range(num_birds):
+            bird = bird_type(self.BIRD_X, self.BIRD_Y)
+            bird.index = i
+            self.birds.append(bird)
+        self.fitness = [0] * num_birds
+        self.pipes = [pipe_type(700, self.rng)]
+        self.base = base_type(FLOOR)
+        self.score = 0
+        self.frame = 0
+
+    def move_birds(self):
+        self.frame += 1
+        pipe_ind = 0
+        if len(self.pipes) > 1 and self.birds and self.birds[0].x > self.pipes[0].x + PIPE_WIDTH:
+            pipe_ind = 1
+
+        for bird in self.birds:
+            self.fitness[bird.index] += 0.1
+            bird.move()
+        return pipe_ind
+
+    def observations(self, pipe_ind):
+        pipe = self.pipes[pipe_ind]
+        return [(bird.y, abs(bird.y - pipe.height), abs(bird.y - pipe.bottom)) for bird in self.birds]
+
+    def advance(self, jumps):
+        """Apply one jump flag per live bird and finish the frame.
+
+        Returns the birds that crashed into a pipe this frame.
+        """
+        for bird, jump in zip(self.birds, jumps):
+            if jump:
+                bird.jump()
+
+        self.base.move(self.game_speed)
+
+        crashed = []
+        rem = []
+        add_pipe = False
+        for pipe in self.pipes:
+            pipe.move(self.game_speed)
+
+            hit = [bird for bird in self.birds if pipe.collide(bird)]
+            if hit:
+                for bird in hit:
+                    self.fitness[bird.index] -= 1
+                self.birds = [bird for bird in self.birds if bird not in hit]
+                crashed.extend(hit)
+
+            if pipe.x + PIPE_WIDTH < 0:
+                rem.append(pipe)
+
+            if not pipe.passed and pipe.x < self.BIRD_X:
+                pipe.passed = True
+                add_pipe = True
+
+        if add_pipe:
+            self.score += 1
+            for bird in self.birds:
+                self.fitness[bird.index] += 5
+            self.pipes.append(self.pipe_type(WIN_WIDTH, self.rng))
+
+        for r in rem:
+            self.pipes.remove(r)
+
+        self.birds = [bird for bird in self.birds
+                      if not (bird.y + BIRD_HEIGHT - 10 >= FLOOR or bird.y < -50)]
+
+        for bird in self.birds:
+            bird.animate()
+        return crashed
+
+
+def benchmark(num_birds=50, frames=5000, seed=0):
+    # random flappers, restarted whenever the whole flock is gone
+    rng = random.Random(seed)
+    sim = FlappySim(num_birds, seed=seed)
+    start = time.perf_counter()
+    for _ in range(frames):
+        if not sim.birds:
+            sim = FlappySim(num_birds, seed=seed)
+        sim.move_birds()
+        sim.advance([rng.random() < 0.1 for _ in sim.birds])
+    elapsed = time.perf_counter() - start
+    print(f"{frames / elapsed:,.0f} frames/s with up to {num_birds} birds")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -11,10 +11,11 @@ STAT_FONT = pygame.font.SysFont("comicsans", 50)
 END_FONT = pygame.font.SysFont("comicsans", 70)
 DRAW_LINES = False
 
-pipe_img = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "pipe.png")).convert_alpha())
-bg_img = pygame.transform.scale(pygame.image.load(os.path.join("imgs", "bg.png")).convert_alpha(), (600, 900))
+# Plain loads need no display; call convert_sprites() once a window is open
+pipe_img = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "pipe.png")))
+bg_img = pygame.transform.scale(pygame.image.load(os.path.join("imgs", "bg.png")), (600, 900))
 bird_images = [pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", f"bird{x}.png"))) for x in range(1, 4)]
-base_img = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "base.png")).convert_alpha())
+base_img = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs", "base.png")))
 
 gen = 0
 
@@ -24,6 +25,10 @@ class Bird:
     IMGS = bird_images
     ROT_VEL = 20
     ANIMATION_TIME = 5
+    # one collision mask per animation frame, shared by every bird
+    MASKS = {img: pygame.mask.from_surface(img) for img in bird_images}
+    # (image, tilt) -> rotated sprite and its offset, filled in as tilts come up
+    ROTATED = {}
 
     def __init__(self, x, y):
 
@@ -83,36 +88,45 @@ class Bird:
             self.img = self.IMGS[1]
             self.img_count = self.ANIMATION_TIME*2
 
-        blitRotateCenter(win, self.img, (self.x, self.y), self.tilt)
+        key = (self.img, self.tilt)
+        if key not in self.ROTATED:
+            self.ROTATED[key] = rotateCenter(self.img, self.tilt)
+        rotated_image, (dx, dy) = self.ROTATED[key]
+        rect = self.img.get_rect(topleft = (self.x, self.y))
+        win.blit(rotated_image, (rect.x + dx, rect.y + dy))
 
     def get_mask(self):
 
-        return pygame.mask.from_surface(self.img)
+        return self.MASKS[self.img]
 
 
 class Pipe:
 
     GAP = 200
     VEL = 5
+    # every pipe shares the same images, so their masks are built once
+    PIPE_TOP = pygame.transform.flip(pipe_img, False, True)
+    PIPE_BOTTOM = pipe_img
+    TOP_MASK = pygame.mask.from_surface(PIPE_TOP)
+    BOTTOM_MASK = pygame.mask.from_surface(PIPE_BOTTOM)
 
-    def __init__(self, x):
+    def __init__(self, x, rng=None):
 
         self.x = x
+        # pipes sharing one seeded random.Random come in a repeatable sequence
+        self.rng = rng if rng is not None else random
         self.height = 0
 
         self.top = 0
         self.bottom = 0
 
-        self.PIPE_TOP = pygame.transform.flip(pipe_img, False, True)
-        self.PIPE_BOTTOM = pipe_img
-
         self.passed = False
 
         self.set_height()
 
     def set_height(self):
 
-        self.height = random.randrange(50, 450)
+        self.height = self.rng.randrange(50, 450)
         self.top = self.height - self.PIPE_TOP.get_height()
         self.bottom = self.height + self.GAP
 
@@ -127,14 +141,19 @@ class Pipe:
 
     def collide(self, bird, win):
 
+        # broad phase: pixels can only overlap where the bounding boxes do
+        bird_rect = pygame.Rect(bird.x, round(bird.y), bird.img.get_width(), bird.img.get_height())
+        top_hit = bird_rect.colliderect(pygame.Rect(self.x, self.top, self.PIPE_TOP.get_width(), self.PIPE_TOP.get_height()))
+        bottom_hit = bird_rect.colliderect(pygame.Rect(self.x, self.bottom, self.PIPE_BOTTOM.get_width(), self.PIPE_BOTTOM.get_height()))
+        if not (top_hit or bottom_hit):
+            return False
+
         bird_mask = bird.get_mask()
-        top_mask = pygame.mask.from_surface(self.PIPE_TOP)
-        bottom_mask = pygame.mask.from_surface(self.PIPE_BOTTOM)
         top_offset = (self.x - bird.x, self.top - round(bird.y))
         bottom_offset = (self.x - bird.x, self.bottom - round(bird.y))
 
-        b_point = bird_mask.overlap(bottom_mask, bottom_offset)
-        t_point = bird_mask.overlap(top_mask,top_offset)
+        b_point = bottom_hit and bird_mask.overlap(self.BOTTOM_MASK, bottom_offset)
+        t_point = top_hit and bird_mask.overlap(self.TOP_MASK, top_offset)
 
         if b_point or t_point:
             return True
@@ -170,12 +189,23 @@ class Base:
         win.blit(self.IMG, (self.x2, self.y))
 
 
-def blitRotateCenter(surf, image, topleft, angle):
+def convert_sprites():
+
+    # display-format copies blit faster; the masks were built from the plain loads
+    global bg_img
+    bg_img = bg_img.convert_alpha()
+    Pipe.PIPE_TOP = Pipe.PIPE_TOP.convert_alpha()
+    Pipe.PIPE_BOTTOM = Pipe.PIPE_BOTTOM.convert_alpha()
+    Base.IMG = Base.IMG.convert_alpha()
+
+
+def rotateCenter(image, angle):
 
+    # the rotated image and its top-left relative to the unrotated image's
     rotated_image = pygame.transform.rotate(image, angle)
-    new_rect = rotated_image.get_rect(center = image.get_rect(topleft = topleft).center)
+    new_rect = rotated_image.get_rect(center = image.get_rect().center)
 
-    surf.blit(rotated_image, new_rect.topleft)
+    return rotated_image, new_rect.topleft
 
 
 # import matplotlib.pyplot as plt
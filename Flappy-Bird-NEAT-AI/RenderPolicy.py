@@ -0,0 +1,109 @@
+import queue
+import sys
+import threading
+import pygame
+
+NEVER = "never"
+EVERY_N = "every_n"
+BEST = "best"
+FIRST_K = "first_k"
+
+# Number keys switch the policy while training
+KEYS = {
+    pygame.K_0: NEVER,
+    pygame.K_1: EVERY_N,
+    pygame.K_2: BEST,
+    pygame.K_3: FIRST_K,
+}
+# ...and so does typing the same digit and Enter in the terminal, which
+# also works while no window is open
+TYPED = {"0": NEVER, "1": EVERY_N, "2": BEST, "3": FIRST_K}
+
+
+class RenderPolicy:
+    """Decides which agents and frames get drawn during NEAT training.
+
+    never   - nothing is drawn, the simulation runs flat out
+    every_n - every agent, but only every n-th frame
+    best    - every frame of the current best agent only
+    first_k - every frame of the first k agents only
+
+    Frames that are not drawn are not frame-capped either, so the
+    simulation runs at full speed between rendered frames. Press 0-3 in
+    the game window, or type 0-3 and Enter in the terminal, to switch
+    policy at runtime; the window opens with the first frame drawn.
+    """
+
+    def __init__(self, mode=EVERY_N, n=10, k=1, fps=30):
+        if mode not in KEYS.values():
+            raise ValueError("Unknown render mode '{0}'".format(mode))
+        self.mode = mode
+        self.n = n
+        self.k = k
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+        # lines typed in the terminal, filled by a reader thread started on first use
+        self.typed = None
+
+    def describe(self):
+        if self.mode == EVERY_N:
+            return "every {0} frames".format(self.n)
+        if self.mode == FIRST_K:
+            return "first {0} agents".format(self.k)
+        return self.mode
+
+    def set_mode(self, mode):
+        self.mode = mode
+        print("Rendering: " + self.describe())
+
+    def handle_events(self):
+        self._read_terminal()
+        while not self.typed.empty():
+            line = self.typed.get().strip()
+            if line in TYPED:
+                self.set_mode(TYPED[line])
+
+        # key presses only arrive once the game window is open
+        if pygame.display.get_surface() is None:
+            return
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                quit()
+            if event.type == pygame.KEYDOWN and event.key in KEYS:
+                self.set_mode(KEYS[event.key])
+
+    def _read_terminal(self):
+        if self.typed is not None:
+            return
+        self.typed = queue.Queue()
+        # only an interactive terminal; piped input is left for the program
+        if sys.stdin is None or not sys.stdin.isatty():
+            return
+
+        def read(typed):
+            for line in sys.stdin:
+                typed.put(line)
+
+        # a daemon thread, so a blocked read never holds up exit
+        threading.Thread(target=read, args=(self.typed,), daemon=True).start()
+
+    def agent_visible(self, index, is_best):
+        if self.mode == NEVER:
+            return False
+        if self.mode == BEST:
+            return is_best
+        if self.mode == FIRST_K:
+            return index < self.k
+        return True
+
+    def frame_due(self, frame):
+        if self.mode == NEVER:
+            return False
+        if self.mode == EVERY_N:
+            return frame % self.n == 0
+        return True
+
+    def tick(self):
+        # cap the frame rate of rendered frames only
+        self.clock.tick(self.fps)
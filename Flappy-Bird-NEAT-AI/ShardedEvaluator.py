@@ -0,0 +1,61 @@
+import multiprocessing
+import random
+import numpy as np
+from BatchedNetwork import BatchedNetwork
+from BirdPopulation import PopulationSim
+
+
+def play_shard(genomes, config, seed):
+    """Fly genomes headless through the pipes of seed until all of them are dead.
+
+    Returns their fitness array and the score the last bird reached.
+    """
+    net = BatchedNetwork.create(genomes, config)
+    game = PopulationSim(len(genomes), seed=seed)
+    while game.population.alive.any():
+        pipe_ind = game.move_birds()
+        outputs = net.activate(game.observations(pipe_ind), game.alive())
+        game.advance(outputs[:, 0] > 0.5)
+    return game.fitness, game.score
+
+
+class ShardedEvaluator:
+    """Splits a generation's birds into one shard per worker process.
+
+    Birds never affect the pipes or each other, so every shard plays its
+    own PopulationSim against the same seeded pipe sequence and the
+    results are exactly those of one world holding the whole flock. A
+    shard stops as soon as its own birds are dead.
+
+    The workers start with start_method ("spawn" by default, the only
+    method on Windows) so they behave the same on every platform. Spawned
+    workers import play_shard from this module, which like FlappySim and
+    BirdPopulation opens no window, but they also re-run the top level of
+    the training script, so that must stay free of display calls too.
+    Call close() once training is done to shut the workers down.
+    """
+
+    def __init__(self, num_workers, start_method="spawn"):
+        self.num_workers = num_workers
+        self.pool = multiprocessing.get_context(start_method).Pool(num_workers)
+
+    def close(self):
+        # stop the workers when training ends, not at interpreter exit; like
+        # leaving a "with Pool()" block, interrupted shards are not waited for
+        self.pool.terminate()
+        self.pool.join()
+
+    def evaluate(self, genomes, config, seed=None):
+        """Set the fitness of every (genome_id, genome) pair and return the generation's score."""
+        if seed is None:
+            # the shards still have to agree on one pipe sequence
+            seed = random.Random().randrange(2 ** 32)
+
+        shards = [shard for shard in np.array_split(np.arange(len(genomes)), self.num_workers) if len(shard)]
+        jobs = [([genomes[i][1] for i in shard], config, seed) for shard in shards]
+        score = 0
+        for shard, (fitness, shard_score) in zip(shards, self.pool.starmap(play_shard, jobs)):
+            for i, value in zip(shard, fitness):
+                genomes[i][1].fitness = float(value)
+            score = max(score, shard_score)
+        return score
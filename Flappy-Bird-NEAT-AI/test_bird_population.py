@@ -0,0 +1,44 @@
+import random
+import numpy as np
+import pytest
+from FlappySim import FlappySim
+from BirdPopulation import PopulationSim
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_matches_flappy_sim(seed):
+    n = 100
+    sim = FlappySim(n, seed=seed)
+    population_sim = PopulationSim(n, seed=seed)
+    # random flappers, some jumpier than others
+    rng = random.Random(seed)
+    jump_rate = rng.uniform(0.03, 0.2)
+
+    while sim.birds:
+        pipe_ind = sim.move_birds()
+        assert population_sim.move_birds() == pipe_ind
+        np.testing.assert_array_equal(population_sim.observations(pipe_ind), sim.observations(pipe_ind))
+
+        jumps = [rng.random() < jump_rate for _ in sim.birds]
+        crashed = sim.advance(jumps)
+        assert sorted(population_sim.advance(np.array(jumps)).tolist()) == sorted(bird.index for bird in crashed)
+
+        population = population_sim.population
+        assert population_sim.alive().tolist() == [bird.index for bird in sim.birds]
+        for bird in sim.birds:
+            assert (population.y[bird.index], population.tilt[bird.index], population.img_index[bird.index]) == \
+                (bird.y, bird.tilt, bird.img_index)
+
+    assert not population_sim.population.alive.any()
+    assert population_sim.fitness.tolist() == sim.fitness
+    assert population_sim.score == sim.score
+
+
+def test_bird_copies_a_row():
+    population_sim = PopulationSim(3, seed=0)
+    population_sim.move_birds()
+    population_sim.advance(np.array([False, True, False]))
+
+    bird = population_sim.population.bird(1)
+    assert (bird.y, bird.tilt, bird.img_index, bird.index) == \
+        (population_sim.population.y[1], population_sim.population.tilt[1], population_sim.population.img_index[1], 1)
@@ -0,0 +1,149 @@
+import random
+import neat
+import numpy as np
+import pytest
+from BatchedNetwork import BatchedNetwork
+
+
+# the bird network: 3 inputs, 1 output, tanh
+CONFIG = """
+[NEAT]
+fitness_criterion     = max
+fitness_threshold     = 100000
+pop_size              = 50
+reset_on_extinction   = False
+
+[DefaultGenome]
+feed_forward           = True
+num_inputs            = 3
+num_outputs           = 1
+# num_hidden            = 0
+activation_default    = tanh
+activation_mutate_rate= 0.0
+activation_options    = tanh
+
+aggregation_default   = sum
+aggregation_mutate_rate = 0.0
+aggregation_options   = sum
+
+bias_init_mean        = 0.0
+bias_init_stdev       = 1.0
+bias_max_value        = 30.0
+bias_min_value        = -30.0
+bias_mutate_power     = 0.5
+bias_mutate_rate      = 0.7
+bias_replace_rate     = 0.1
+
+compatibility_disjoint_coefficient = 1.0
+compatibility_weight_coefficient = 0.5
+
+conn_add_prob         = 0.5
+conn_delete_prob      = 0.3
+
+enabled_default       = True
+enabled_mutate_rate   = 0.01
+
+initial_connection    = full
+
+node_add_prob         = 0.2
+node_delete_prob      = 0.2
+
+num_hidden            = 0
+response_init_mean    = 1.0
+response_init_stdev   = 0.0
+response_max_value    = 30.0
+response_min_value    = -30.0
+response_mutate_power = 0.0
+response_mutate_rate  = 0.0
+response_replace_rate = 0.0
+
+weight_init_mean      = 0.0
+weight_init_stdev     = 1.0
+weight_max_value      = 30
+weight_min_value      = -30
+weight_mutate_power   = 0.5
+weight_mutate_rate    = 0.8
+weight_replace_rate   = 0.1
+
+[DefaultSpeciesSet]
+compatibility_threshold = 3.0
+
+[DefaultStagnation]
+species_fitness_func = max
+max_stagnation       = 20
+species_elitism      = 2
+
+[DefaultReproduction]
+elitism               = 2
+survival_threshold    = 0.2
+"""
+
+
+def make_config(tmp_path, activations=('tanh',)):
+    path = tmp_path / "config-feedforward.txt"
+    path.write_text(CONFIG)
+    config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                                neat.DefaultSpeciesSet, neat.DefaultStagnation, str(path))
+    genome_config = config.genome_config
+    genome_config.activation_options = list(activations)
+    genome_config.activation_mutate_rate = 0.5 if len(activations) > 1 else 0.0
+    return config
+
+
+def make_genomes(config, n=30, seed=0):
+    # mutated a random number of times, so the networks differ in depth and width
+    random.seed(seed)
+    genomes = []
+    for key in range(n):
+        genome = config.genome_type(key)
+        genome.configure_new(config.genome_config)
+        for _ in range(random.randint(0, 40)):
+            genome.mutate(config.genome_config)
+        genomes.append(genome)
+    return genomes
+
+
+def reference_outputs(genomes, config, inputs):
+    return np.array([neat.nn.FeedForwardNetwork.create(genome, config).activate(list(x))
+                     for genome, x in zip(genomes, inputs)])
+
+
+@pytest.mark.parametrize('activations', [('tanh',), ('tanh', 'sigmoid', 'relu', 'identity', 'clamped', 'gauss', 'abs')])
+def test_matches_feed_forward_network(tmp_path, activations):
+    config = make_config(tmp_path, activations)
+    genomes = make_genomes(config)
+    net = BatchedNetwork.create(genomes, config)
+    rng = np.random.default_rng(0)
+
+    for _ in range(10):
+        inputs = rng.integers(0, 2, (len(genomes), config.genome_config.num_inputs)).astype(float)
+        # a matmul may add the terms in another order than sum() does
+        np.testing.assert_allclose(net.activate(inputs), reference_outputs(genomes, config, inputs),
+                                   rtol=1e-9, atol=1e-9)
+
+
+def test_rows_select_the_live_genomes(tmp_path):
+    config = make_config(tmp_path)
+    genomes = make_genomes(config)
+    net = BatchedNetwork.create(genomes, config)
+    rows = np.array([1, 4, 5, 20])
+    inputs = np.random.default_rng(1).integers(0, 2, (len(rows), config.genome_config.num_inputs)).astype(float)
+
+    full = np.zeros((len(genomes), inputs.shape[1]))
+    full[rows] = inputs
+
+    # a genome's outputs do not depend on which other genomes are in the batch
+    np.testing.assert_array_equal(net.activate(inputs, rows), net.activate(full)[rows])
+    np.testing.assert_allclose(net.activate(inputs, rows),
+                               reference_outputs([genomes[i] for i in rows], config, inputs),
+                               rtol=1e-9, atol=1e-9)
+
+
+def test_rejects_unsupported_aggregation(tmp_path):
+    config = make_config(tmp_path)
+    genomes = make_genomes(config, n=2)
+    for node in genomes[1].nodes.values():
+        node.aggregation = 'max'
+
+    with pytest.raises(ValueError):
+        BatchedNetwork.create(genomes, config)
@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+import pygame
+import pytest
+import FlappySim
+
+IMG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "imgs")
+
+
+def load_sprite(name):
+    # the scale2x sprite the game draws; a plain load needs no display
+    return pygame.transform.scale2x(pygame.image.load(os.path.join(IMG_DIR, name)))
+
+
+def mask_rows(surface):
+    # the opaque columns of every row of the sprite's collision mask
+    mask = pygame.mask.from_surface(surface)
+    width, height = mask.get_size()
+    return [[x for x in range(width) if mask.get_at((x, y))] for y in range(height)]
+
+
+def assert_spans_match(spans, surface):
+    rows = mask_rows(surface)
+    assert len(spans) == len(rows)
+    for y, (columns, (left, right)) in enumerate(zip(rows, spans)):
+        # a span is only exact while the row is one solid run
+        assert columns == list(range(left, right + 1)), "row {0}".format(y)
+
+
+@pytest.mark.parametrize('frame', range(3))
+def test_bird_spans_match_the_sprite_masks(frame):
+    sprite = load_sprite("bird{0}.png".format(frame + 1))
+    assert sprite.get_size() == (FlappySim.BIRD_WIDTH, FlappySim.BIRD_HEIGHT)
+    assert_spans_match(FlappySim.BIRD_SPANS[frame], sprite)
+
+
+def test_pipe_spans_match_the_sprite_masks():
+    pipe = load_sprite("pipe.png")
+    assert pipe.get_size() == (FlappySim.PIPE_WIDTH, FlappySim.PIPE_HEIGHT)
+    assert_spans_match(FlappySim.PIPE_BOTTOM_SPANS, pipe)
+    assert_spans_match(FlappySim.PIPE_TOP_SPANS, pygame.transform.flip(pipe, False, True))
+
+
+def test_base_width_matches_the_sprite():
+    assert load_sprite("base.png").get_width() == FlappySim.BASE_WIDTH
+
+
+def test_spans_overlap_agrees_with_masks():
+    bird = load_sprite("bird1.png")
+    pipe = load_sprite("pipe.png")
+    bird_mask = pygame.mask.from_surface(bird)
+    pipe_mask = pygame.mask.from_surface(pipe)
+    # the bird sweeps across the pipe's cap and bevel
+    for dx in range(-FlappySim.BIRD_WIDTH, FlappySim.PIPE_WIDTH + 1, 3):
+        for dy in range(-FlappySim.BIRD_HEIGHT, 60, 2):
+            expected = bird_mask.overlap(pipe_mask, (-dx, -dy)) is not None
+            assert FlappySim.spans_overlap(FlappySim.BIRD_SPANS[0], dx, dy, FlappySim.PIPE_BOTTOM_SPANS, 0, 0) == expected
+
+
+def test_shard_workers_never_import_pygame():
+    # what a spawned ShardedEvaluator worker imports to fly its shard
+    code = "import sys, ShardedEvaluator; sys.exit('pygame' in sys.modules)"
+    subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
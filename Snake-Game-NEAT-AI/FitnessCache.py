@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from neat.reporting import BaseReporter
+
+
+def genome_signature(genome, seed):
+    """Canonical, hashable description of everything that decides a genome's
+    fitness: its nodes, enabled connections and the evaluation seed."""
+    nodes = tuple(sorted(
+        (key, ng.bias, ng.response, ng.activation, ng.aggregation)
+        for key, ng in genome.nodes.items()))
+    connections = tuple(sorted(
+        (key, cg.weight) for key, cg in genome.connections.items() if cg.enabled))
+    return seed, nodes, connections
+
+
+class FitnessCache:
+    """Least-recently-used map from genome signature to evaluation result.
+
+    Elites and unchanged clones come back every generation with the same
+    structure and weights; looking them up skips their simulation. At most
+    max_size results are kept, so memory stays flat over long runs.
+    """
+
+    def __init__(self, max_size=1000):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, genome, seed):
+        key = genome_signature(genome, seed)
+        result = self.entries.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return result
+
+    def put(self, genome, seed, result):
+        key = genome_signature(genome, seed)
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class FitnessCacheReporter(BaseReporter):
+    """Prints how many evaluations the cache saved each generation."""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.last_hits = 0
+        self.last_misses = 0
+
+    def post_evaluate(self, config, population, species, best_genome):
+        hits = self.cache.hits - self.last_hits
+        misses = self.cache.misses - self.last_misses
+        self.last_hits = self.cache.hits
+        self.last_misses = self.cache.misses
+        lookups = hits + misses
+        rate = hits / lookups if lookups else 0.0
+        print(f"Fitness cache: {hits}/{lookups} hits this generation ({rate:.1%}), "
+              f"{self.cache.hit_rate():.1%} overall, {len(self.cache.entries)} entries")
@@ -0,0 +1,127 @@
+import json
+import os
+import numpy as np
+
+# File layout: a 16-byte header followed by 2-byte records. Each record
+# packs a 0/1 state of up to 8 features into one byte (feature i in bit i)
+# and the action index (0 = straight, 1 = right, 2 = left) into the next.
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('state_size', '<u4'),
+])
+RECORD_DTYPE = np.dtype([('state', 'u1'), ('action', 'u1')])
+MAGIC = b'SNKPLAY1'
+VERSION = 1
+
+
+def pack_state(state):
+    bits = 0
+    for i, value in enumerate(state):
+        if value:
+            bits |= 1 << i
+    return bits
+
+
+def unpack_states(packed, state_size=7):
+    """(n,) array of state bytes -> (n, state_size) uint8 array of 0/1 features."""
+    bits = np.unpackbits(np.asarray(packed, dtype=np.uint8)[:, None], axis=1, bitorder='little')
+    return bits[:, :state_size]
+
+
+def action_index(action):
+    # one-hot [straight, right, left] or a plain index
+    if isinstance(action, (int, np.integer)):
+        return int(action)
+    return int(np.argmax(action))
+
+
+class GameplayRecorder:
+    """Appends state/action pairs to a packed binary gameplay file.
+
+    Records are collected in a preallocated chunk and written out once it
+    fills, so a human play session costs one small write per chunk_size
+    moves. Opening an existing file appends to it. Use as a context
+    manager, or call close() to write out the last partial chunk.
+    """
+
+    def __init__(self, path, state_size=7, chunk_size=4096):
+        if state_size > 8:
+            raise ValueError("Packed gameplay states hold at most 8 features, got {0}".format(state_size))
+        self.state_size = state_size
+        self.chunk = np.zeros(chunk_size, dtype=RECORD_DTYPE)
+        self.count = 0
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            read_header(path, state_size)
+            self.file = open(path, 'ab')
+        else:
+            self.file = open(path, 'wb')
+            header = np.array([(MAGIC, VERSION, state_size)], dtype=HEADER_DTYPE)
+            self.file.write(header.tobytes())
+
+    def record(self, state, action):
+        self.chunk[self.count] = (pack_state(state), action_index(action))
+        self.count += 1
+        if self.count == len(self.chunk):
+            self.flush()
+
+    def flush(self):
+        self.file.write(self.chunk[:self.count].tobytes())
+        self.file.flush()
+        self.count = 0
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_header(path, state_size=None):
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    if len(header) == 0 or header[0]['magic'] != MAGIC or header[0]['version'] != VERSION:
+        raise ValueError("{0} is not a gameplay recording".format(path))
+    if state_size is not None and header[0]['state_size'] != state_size:
+        raise ValueError("{0} stores states of size {1}, not {2}".format(path, header[0]['state_size'], state_size))
+    return header[0]
+
+
+def load_gameplay(path):
+    """Memory-map a recording without reading it.
+
+    Returns (records, state_size); records['state'] and records['action']
+    are zero-copy views, and unpack_states() expands any slice of states.
+    """
+    header = read_header(path)
+    num_records = (os.path.getsize(path) - HEADER_DTYPE.itemsize) // RECORD_DTYPE.itemsize
+    if num_records == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE), int(header['state_size'])
+    records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_DTYPE.itemsize, shape=(num_records,))
+    return records, int(header['state_size'])
+
+
+def convert_json(json_path, out_path):
+    # gameplay_data.json: a list of {"state": [7 x 0/1], "action": one-hot}
+    with open(json_path) as f:
+        samples = json.load(f)
+    state_size = len(samples[0]['state']) if samples else 7
+    with GameplayRecorder(out_path, state_size=state_size) as recorder:
+        for sample in samples:
+            recorder.record(sample['state'], sample['action'])
+    return len(samples)
+
+
+if __name__ == '__main__':
+    json_path = "gameplay_data.json"
+    out_path = "gameplay_data.bin"
+    if os.path.exists(out_path):
+        os.remove(out_path)
+    n = convert_json(json_path, out_path)
+    print(f"{json_path}: {n} samples, {os.path.getsize(json_path):,} bytes -> "
+          f"{out_path}: {os.path.getsize(out_path):,} bytes")
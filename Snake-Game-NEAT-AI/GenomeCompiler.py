@@ -0,0 +1,122 @@
+import os
+import pickle
+import random
+import timeit
+import neat
+from neat.activations import relu_activation, identity_activation
+from neat.aggregations import sum_aggregation
+from neat.graphs import feed_forward_layers
+
+# Python 3.12+ sums floats with compensation, so sum() can only be unrolled
+# into a chain of + when the interpreter still adds left to right.
+PLAIN_FLOAT_SUM = sum([1e16, 1.0, -1e16]) == 0.0
+
+# Compiled functions keyed by their generated source
+_compiled = {}
+
+
+def genome_source(genome, config):
+    """Generate Python source for an activate(inputs) function equivalent to
+    neat.nn.FeedForwardNetwork.create(genome, config).activate.
+
+    Disabled connections and nodes that never reach an output are left out,
+    and every remaining node becomes one local-variable assignment.
+    Returns (source, globals) where globals holds the non-inlined functions.
+    """
+    genome_config = config.genome_config
+    input_keys = genome_config.input_keys
+    output_keys = genome_config.output_keys
+
+    connections = [cg.key for cg in genome.connections.values() if cg.enabled]
+    layers = feed_forward_layers(input_keys, output_keys, connections)
+
+    names = {key: "i{0}".format(i) for i, key in enumerate(input_keys)}
+    funcs = {}
+    lines = ["def activate(inputs):",
+             "    {0}, = inputs".format(", ".join(names[key] for key in input_keys))]
+
+    for layer in layers:
+        for node in layer:
+            names[node] = "v{0}".format(len(names) - len(input_keys))
+            # same link order as FeedForwardNetwork.create
+            terms = ["{0} * {1!r}".format(names[inode], genome.connections[(inode, onode)].weight)
+                     for inode, onode in connections if onode == node]
+
+            ng = genome.nodes[node]
+            agg = genome_config.aggregation_function_defs.get(ng.aggregation)
+            act = genome_config.activation_defs.get(ng.activation)
+
+            if agg is sum_aggregation and PLAIN_FLOAT_SUM:
+                # sum() starts from the int 0, keep it for identical results
+                s = "(" + " + ".join(["0"] + terms) + ")"
+            else:
+                agg_name = "agg_" + ng.aggregation
+                funcs[agg_name] = agg
+                s = "{0}([{1}])".format(agg_name, ", ".join(terms))
+
+            z = "{0!r} + {1!r} * {2}".format(ng.bias, ng.response, s)
+            if act is relu_activation:
+                lines.append("    z = {0}".format(z))
+                lines.append("    {0} = z if z > 0.0 else 0.0".format(names[node]))
+            elif act is identity_activation:
+                lines.append("    {0} = {1}".format(names[node], z))
+            else:
+                act_name = "act_" + ng.activation
+                funcs[act_name] = act
+                lines.append("    {0} = {1}({2})".format(names[node], act_name, z))
+
+    # outputs that are never computed stay at their initial 0.0
+    outputs = [names.get(key, "0.0") for key in output_keys]
+    lines.append("    return [{0}]".format(", ".join(outputs)))
+    return "\n".join(lines) + "\n", funcs
+
+
+def compile_genome(genome, config):
+    """Return a cached, generated activate(inputs) function for the genome."""
+    source, funcs = genome_source(genome, config)
+    key = (source, tuple(sorted((name, id(f)) for name, f in funcs.items())))
+    if key not in _compiled:
+        namespace = dict(funcs)
+        exec(compile(source, "<genome {0}>".format(genome.key), "exec"), namespace)
+        _compiled[key] = namespace["activate"]
+    return _compiled[key]
+
+
+def benchmark(genome, config, samples=1000, number=20):
+    net = neat.nn.FeedForwardNetwork.create(genome, config)
+    activate = compile_genome(genome, config)
+
+    rng = random.Random(0)
+    num_inputs = config.genome_config.num_inputs
+    inputs = [[rng.randint(0, 1) for _ in range(num_inputs)] for _ in range(samples)]
+    mismatches = sum(net.activate(x) != activate(x) for x in inputs)
+
+    t_net = timeit.timeit(lambda: [net.activate(x) for x in inputs], number=number)
+    t_compiled = timeit.timeit(lambda: [activate(x) for x in inputs], number=number)
+    calls = samples * number
+    print(f"FeedForwardNetwork.activate: {t_net / calls * 1e6:.2f} us/call")
+    print(f"compiled genome:             {t_compiled / calls * 1e6:.2f} us/call")
+    print(f"speedup: {t_net / t_compiled:.1f}x, mismatched outputs: {mismatches}")
+
+
+if __name__ == '__main__':
+    config = neat.config.Config(
+        neat.DefaultGenome,
+        neat.DefaultReproduction,
+        neat.DefaultSpeciesSet,
+        neat.DefaultStagnation,
+        "neat-config.txt"
+    )
+
+    if os.path.exists("winner.pkl"):
+        with open("winner.pkl", "rb") as f:
+            genome = pickle.load(f)
+    else:
+        # no trained winner yet, benchmark a heavily mutated random genome
+        random.seed(0)
+        genome = config.genome_type(0)
+        genome.configure_new(config.genome_config)
+        for _ in range(40):
+            genome.mutate(config.genome_config)
+
+    benchmark(genome, config)
@@ -0,0 +1,97 @@
+import os
+import numpy as np
+from GameplayRecorder import load_gameplay, convert_json, pack_state
+from SnakeGame import SnakeGameAI, get_state
+
+STATE_SIZE = 7
+NUM_STATES = 1 << STATE_SIZE
+NUM_ACTIONS = 3
+# ONE_HOT[a] is the play_step action for index a: straight, right, left
+ONE_HOT = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
+
+
+class PolicyTable:
+    """Counts of the recorded action taken in each of the 128 states of get_state().
+
+    The table is built in one pass over a packed gameplay recording, and
+    the policy just indexes it: act(game) packs the 7 features into a byte
+    and returns the most recorded move for it (straight for unseen states).
+    """
+
+    def __init__(self, counts=None):
+        self.counts = np.zeros((NUM_STATES, NUM_ACTIONS), dtype=np.int64) if counts is None else counts
+        self.update_policy()
+
+    @staticmethod
+    def from_recording(path, chunk_size=1 << 20):
+        records, state_size = load_gameplay(path)
+        if state_size != STATE_SIZE:
+            raise ValueError("Expected a recording of {0}-feature states, got {1}".format(STATE_SIZE, state_size))
+        table = PolicyTable()
+        # stream over the memmap so only one chunk is paged in at a time
+        for start in range(0, len(records), chunk_size):
+            chunk = records[start:start + chunk_size]
+            cells = chunk['state'].astype(np.int64) * NUM_ACTIONS + chunk['action']
+            table.counts += np.bincount(cells, minlength=NUM_STATES * NUM_ACTIONS).reshape(NUM_STATES, NUM_ACTIONS)
+        table.update_policy()
+        return table
+
+    def update_policy(self):
+        seen = self.counts.sum(axis=1) > 0
+        best = np.where(seen, self.counts.argmax(axis=1), 0)
+        # plain Python lists keep a decision to two list lookups
+        self.actions = [ONE_HOT[a] for a in best]
+
+    def coverage(self):
+        return int((self.counts.sum(axis=1) > 0).sum())
+
+    def act(self, game):
+        return self.actions[pack_state(get_state(game))]
+
+    def probabilities(self, smoothing=1.0):
+        # Laplace-smoothed P(action | state), uniform for unseen states
+        counts = self.counts + smoothing
+        return counts / counts.sum(axis=1, keepdims=True)
+
+    def warm_start(self, model, steps=500, lr=0.01):
+        """Fit a Linear_QNet(7, hidden, 3) to the table and return it.
+
+        The net is trained on the 128 table rows instead of the raw samples,
+        with each row's cross-entropy against the smoothed action
+        distribution weighted by how often the state was recorded.
+        """
+        if self.counts.sum() == 0:
+            raise ValueError("Cannot warm start from a policy table with no recorded samples")
+        import torch
+        import torch.nn.functional as F
+
+        states = np.unpackbits(np.arange(NUM_STATES, dtype=np.uint8)[:, None], axis=1, bitorder='little')[:, :STATE_SIZE]
+        inputs = torch.as_tensor(states, dtype=torch.float)
+        targets = torch.as_tensor(self.probabilities(), dtype=torch.float)
+        weights = torch.as_tensor(self.counts.sum(axis=1), dtype=torch.float)
+        weights = weights / weights.sum()
+
+        optimizer = torch.optim.Adam(model.parameters(), lr=lr)
+        for _ in range(steps):
+            log_probs = F.log_softmax(model(inputs), dim=1)
+            loss = -(weights * (targets * log_probs).sum(dim=1)).sum()
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+        return model
+
+
+if __name__ == '__main__':
+    path = "gameplay_data.bin"
+    if not os.path.exists(path):
+        convert_json("gameplay_data.json", path)
+
+    table = PolicyTable.from_recording(path)
+    print(f"{table.counts.sum()} samples cover {table.coverage()}/{NUM_STATES} states")
+
+    game = SnakeGameAI(headless=True)
+    while True:
+        reward, done, score = game.play_step(table.act(game))
+        if done:
+            break
+    print(f"Table policy score: {score}")
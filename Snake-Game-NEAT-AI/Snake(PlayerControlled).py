@@ -27,9 +27,10 @@ SPEED = 15
 
 class SnakeGame:
 
-    def __init__(self, w=720, h=640):
+    def __init__(self, w=720, h=640, seed=None):
         self.w = w
         self.h = h
+        self.rng = random.Random(seed)
         # init display
         self.display = pygame.display.set_mode((self.w, self.h), pygame.RESIZABLE)
 
@@ -43,22 +44,40 @@ class SnakeGame:
 
         # init game state
         self.direction = Direction.RIGHT
-        self.head = Point(self.w / 2, self.h / 2)
+        # the middle cell, snapped to the grid the free-cell index uses
+        self.head = Point((self.w // BLOCK_SIZE // 2) * BLOCK_SIZE, (self.h // BLOCK_SIZE // 2) * BLOCK_SIZE)
         self.snake = [self.head,
                       Point(self.head.x - BLOCK_SIZE, self.head.y),
                       Point(self.head.x - (2 * BLOCK_SIZE), self.head.y)]
 
+        # free cells and their index in the list, for constant-time food placement
+        self._free = [Point(x * BLOCK_SIZE, y * BLOCK_SIZE)
+                      for y in range(int(self.h - BLOCK_SIZE) // BLOCK_SIZE + 1)
+                      for x in range(int(self.w - BLOCK_SIZE) // BLOCK_SIZE + 1)]
+        self._free_index = {pt: i for i, pt in enumerate(self._free)}
+        for pt in self.snake:
+            self._occupy(pt)
+
         self.score = 0
         self.moves = 0
         self.food = None
         self._place_food()
 
+    def _occupy(self, pt):
+        # swap the cell with the last free cell and drop it
+        i = self._free_index.pop(pt)
+        last = self._free.pop()
+        if last != pt:
+            self._free[i] = last
+            self._free_index[last] = i
+
+    def _vacate(self, pt):
+        self._free_index[pt] = len(self._free)
+        self._free.append(pt)
+
     def _place_food(self):
-        x = random.randint(0, (self.w - BLOCK_SIZE) // BLOCK_SIZE) * BLOCK_SIZE
-        y = random.randint(0, (self.h - BLOCK_SIZE) // BLOCK_SIZE) * BLOCK_SIZE
-        self.food = Point(x, y)
-        if self.food in self.snake:
-            self._place_food()
+        # food is None once the snake covers the whole board
+        self.food = self.rng.choice(self._free) if self._free else None
 
     def play_step(self):
         # 1. collect user input
@@ -95,11 +114,16 @@ class SnakeGame:
             return game_over, self.score
 
         # 4. place new food or just move
+        self._occupy(self.head)
         if self.head == self.food:
             self.score += 1
             self._place_food()
+            if self.food is None:
+                # the board is full, nothing left to eat
+                game_over = True
+                return game_over, self.score
         else:
-            self.snake.pop()
+            self._vacate(self.snake.pop())
 
         # 5. update ui and clock
         self._update_ui()
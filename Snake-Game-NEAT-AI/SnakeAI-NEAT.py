@@ -2,54 +2,208 @@ import neat
 import pygame
 import os
 import pickle
-from SnakeGame import SnakeGameAI, Point, Direction
+import multiprocessing
+import numpy as np
+from SnakeGame import SnakeGameAI, get_sensors, SPEED
+from SnakeBatchEnv import SnakeBatchEnv
+from BatchedNetwork import BatchedNetwork
+from FitnessCache import FitnessCache, FitnessCacheReporter
 from TrainingGraph import plot
+from RenderPolicy import RenderPolicy
 
 CONFIG_PATH = "neat-config.txt"
+# What serial training draws: "never", "every_n" (every RENDER_EVERY-th frame
+# of every genome), "best" (the previous generation's best genome) or
+# "first_k" (the first RENDER_FIRST_K genomes). Training is headless by
+# default; type 0-3 and Enter in the terminal to switch modes (or press 0-3
+# in the window, which opens with the first drawn frame). Frames that are
+# not drawn run at full speed
+RENDER_MODE = "never"
+RENDER_EVERY = 10
+RENDER_FIRST_K = 1
+render_policy = RenderPolicy(RENDER_MODE, RENDER_EVERY, RENDER_FIRST_K, fps=SPEED)
+# Key of the best genome of the previous generation, shown by the "best" policy
+best_genome_id = None
+# "serial" plays one SnakeGameAI per genome, "parallel" spreads genomes over
+# NUM_WORKERS processes, "vectorized" steps the whole population in lockstep
+# on a SnakeBatchEnv
+EVAL_MODE = "serial"
+NUM_WORKERS = os.cpu_count()
+# Every genome sees the same food sequence; None leaves food placement unseeded
+EVAL_SEED = 0
+# Stop genomes that loop without eating and credit them the fitness the
+# timeout would have given
+DETECT_LOOPS = True
+# Results of recently evaluated genomes, reused for unchanged elites and
+# clones (serial and parallel modes, only when EVAL_SEED is set)
+FITNESS_CACHE_SIZE = 1000
+fitness_cache = FitnessCache(FITNESS_CACHE_SIZE)
 
 # Evaluate a single genome
 
+def eval_genome(genome, config, render_policy=None):
+    net = neat.nn.FeedForwardNetwork.create(genome, config)
+    # the game has its own generator, so seeding it leaves NEAT's random stream alone
+    game = SnakeGameAI(headless=True, detect_loops=DETECT_LOOPS, seed=EVAL_SEED)
+
+    fitness = 0
+    # Calculate initial distance to food
+    old_distance = abs(game.head.x - game.food.x) + abs(game.head.y - game.food.y)
+    # closer[frame] records whether that frame earned the distance bonus
+    closer = [False]
+
+    while True:
+        state = get_state(game)
+        output = net.activate(state)
+        final_move = get_action_from_output(output)
+
+        reward, done, score = game.play_step(final_move)
+        fitness += reward
+
+        # only genomes picked by the render policy get drawn, on its frames
+        if render_policy is not None and not done and render_policy.frame_due(game.frame_iteration):
+            render_policy.handle_events()
+            game.render()
+            render_policy.tick()
+
+        # Bonus for staying alive (but not too much)
+        fitness += 0.1
+
+        # Extra bonus for getting food
+        if reward == 10:
+            fitness += 50
+
+        if game.food is None:
+            break  # the snake filled the board
+
+        # Calculate new distance to food
+        new_distance = abs(game.head.x - game.food.x) + abs(game.head.y - game.food.y)
+        closer.append(new_distance < old_distance)
+        if new_distance < old_distance:
+            fitness += 1  # Reward getting closer to food
+
+        # Update old_distance for the next iteration
+        old_distance = new_distance
+
+        if done:
+            break
+
+    if game.termination == 'loop':
+        fitness = replay_loop(game, closer, fitness)
+
+    return fitness, score
+
+
+def replay_loop(game, closer, fitness):
+    # Add what the remaining frames of a detected loop would have earned,
+    # frame by frame, so the result matches letting it run into the timeout
+    start = game.loop_start
+    period = game.frame_iteration - start
+    for frame in range(game.frame_iteration + 1, game.timeout_frame + 1):
+        fitness += -10 if frame == game.timeout_frame else 0
+        fitness += 0.1
+        if closer[start + (frame - game.frame_iteration - 1) % period + 1]:
+            fitness += 1
+    return fitness
+
+
+def cached_result(genome):
+    # (fitness, score) from an earlier evaluation of an identical genome
+    if EVAL_SEED is None:
+        return None
+    return fitness_cache.get(genome, EVAL_SEED)
+
+
+def store_result(genome, result):
+    if EVAL_SEED is not None:
+        fitness_cache.put(genome, EVAL_SEED, result)
+
+
 def eval_genomes(genomes, config):
-    global global_plot_scores, global_plot_mean_scores
-    global_plot_scores = []
-    global_plot_mean_scores = []
+    for index, (genome_id, genome) in enumerate(genomes):
+        render_policy.handle_events()
+        visible = render_policy.agent_visible(index, genome_id == best_genome_id)
+
+        # genomes that will be drawn are replayed even when their result is cached
+        result = None if visible else cached_result(genome)
+        if result is None:
+            result = eval_genome(genome, config, render_policy if visible else None)
+            store_result(genome, result)
+
+        genome.fitness, score = result
+        print(f"Genome {genome_id} -> Score: {score}, Fitness: {genome.fitness}")
+
+    report_generation(genomes)
+
+
+class ParallelGenomeEvaluator:
+    """Evaluates each genome in its own headless game on a process pool."""
 
-    for genome_id, genome in genomes:
-        net = neat.nn.FeedForwardNetwork.create(genome, config)
-        game = SnakeGameAI()
-        
-        fitness = 0
-        # Calculate initial distance to food
-        old_distance = abs(game.head.x - game.food.x) + abs(game.head.y - game.food.y)
+    def __init__(self, num_workers):
+        self.num_workers = num_workers
+        self.pool = multiprocessing.Pool(num_workers)
 
-        while True:
-            state = get_state(game)
-            output = net.activate(state)
-            final_move = get_action_from_output(output)
+    def close(self):
+        # stop the workers when training ends, not at interpreter exit; like
+        # leaving a "with Pool()" block, interrupted tasks are not waited for
+        self.pool.terminate()
+        self.pool.join()
 
-            reward, done, score = game.play_step(final_move)
-            fitness += reward
+    def eval_genomes(self, genomes, config):
+        results = [cached_result(genome) for _, genome in genomes]
+        # only genomes without a cached result go to the workers
+        todo = [i for i, result in enumerate(results) if result is None]
+        chunksize = max(1, len(todo) // (self.num_workers * 4))
+        jobs = [(genomes[i][1], config) for i in todo]
+        for i, result in zip(todo, self.pool.starmap(eval_genome, jobs, chunksize)):
+            store_result(genomes[i][1], result)
+            results[i] = result
 
-            # Bonus for staying alive (but not too much)
-            fitness += 0.1
+        for (genome_id, genome), (fitness, score) in zip(genomes, results):
+            genome.fitness = fitness
+            print(f"Genome {genome_id} -> Score: {score}, Fitness: {fitness}")
 
-            # Extra bonus for getting food
-            if reward == 10:
-                fitness += 50
+        report_generation(genomes)
 
-            # Calculate new distance to food
-            new_distance = abs(game.head.x - game.food.x) + abs(game.head.y - game.food.y)
-            if new_distance < old_distance:
-                fitness += 1  # Reward getting closer to food
 
-            # Update old_distance for the next iteration
-            old_distance = new_distance
+def eval_genomes_vectorized(genomes, config):
+    nets = BatchedNetwork.create([genome for _, genome in genomes], config)
+    env = SnakeBatchEnv(len(genomes), seed=EVAL_SEED)
+    fitness = np.zeros(len(genomes))
+    state = env.get_state()
+    # Calculate initial distance to food
+    old_distance = np.abs(env.head_x - env.food_x) + np.abs(env.head_y - env.food_y)
 
-            if done:
-                break
+    while not env.done.all():
+        actions = np.zeros(len(genomes), dtype=np.int64)
+        live = np.flatnonzero(~env.done)
+        actions[live] = nets.activate(state[live], live).argmax(axis=1)
+
+        running = ~env.done
+        state, reward, done, score = env.step(actions)
+
+        # same shaping as eval_genomes, applied to the boards that moved
+        new_distance = np.abs(env.head_x - env.food_x) + np.abs(env.head_y - env.food_y)
+        fitness[running] += reward[running]
+        fitness[running] += 0.1
+        fitness[running & (reward == 10)] += 50
+        fitness[running & (new_distance < old_distance)] += 1
+        old_distance = new_distance
+
+    for i, (genome_id, genome) in enumerate(genomes):
+        genome.fitness = float(fitness[i])
+        print(f"Genome {genome_id} -> Score: {env.score[i]}, Fitness: {genome.fitness}")
+
+    report_generation(genomes)
+
+
+def report_generation(genomes):
+    global global_plot_scores, global_plot_mean_scores, best_genome_id
+    global_plot_scores = []
+    global_plot_mean_scores = []
 
-        genome.fitness = fitness
-        print(f"Genome {genome_id} -> Score: {score}, Fitness: {fitness}")
+    # elites carry over, so this genome is usually in the next generation too
+    best_genome_id = max(genomes, key=lambda item: item[1].fitness)[0]
 
     # Compute best and mean scores after processing all genomes
     scores = [g.fitness for _, g in genomes]
@@ -62,52 +216,10 @@ def eval_genomes(genomes, config):
     # Plot the scores
     plot(global_plot_scores, global_plot_mean_scores)
 
-# Convert game state into NEAT input (11-dim)
+# Convert game state into NEAT input (11-dim): danger straight/right/left,
+# move direction left/right/up/down, food left/right/up/down
 def get_state(game):
-    head = game.snake[0]
-    point_l = Point(head.x - 20, head.y)
-    point_r = Point(head.x + 20, head.y)
-    point_u = Point(head.x, head.y - 20)
-    point_d = Point(head.x, head.y + 20)
-
-    dir_l = game.direction == Direction.LEFT
-    dir_r = game.direction == Direction.RIGHT
-    dir_u = game.direction == Direction.UP
-    dir_d = game.direction == Direction.DOWN
-
-    state = [
-        # Danger straight
-        (dir_r and game.is_collision(point_r)) or
-        (dir_l and game.is_collision(point_l)) or
-        (dir_u and game.is_collision(point_u)) or
-        (dir_d and game.is_collision(point_d)),
-
-        # Danger right
-        (dir_u and game.is_collision(point_r)) or
-        (dir_d and game.is_collision(point_l)) or
-        (dir_l and game.is_collision(point_u)) or
-        (dir_r and game.is_collision(point_d)),
-
-        # Danger left
-        (dir_d and game.is_collision(point_r)) or
-        (dir_u and game.is_collision(point_l)) or
-        (dir_r and game.is_collision(point_u)) or
-        (dir_l and game.is_collision(point_d)),
-
-        # Move direction
-        dir_l,
-        dir_r,
-        dir_u,
-        dir_d,
-
-        # Food location
-        game.food.x < head.x,  # food left
-        game.food.x > head.x,  # food right
-        game.food.y < head.y,  # food up
-        game.food.y > head.y   # food down
-    ]
-
-    return list(map(int, state))
+    return get_sensors(game)
 
 # Get [1, 0, 0] / [0, 1, 0] / [0, 0, 1] from NEAT output
 def get_action_from_output(output):
@@ -130,8 +242,22 @@ def run(config_path):
     p.add_reporter(neat.StdOutReporter(True))
     stats = neat.StatisticsReporter()
     p.add_reporter(stats)
+    if EVAL_MODE != "vectorized":
+        p.add_reporter(FitnessCacheReporter(fitness_cache))
 
-    winner = p.run(eval_genomes, 50)  # number of generations
+    evaluator = None
+    if EVAL_MODE == "parallel":
+        evaluator = ParallelGenomeEvaluator(NUM_WORKERS)
+        evaluate = evaluator.eval_genomes
+    elif EVAL_MODE == "vectorized":
+        evaluate = eval_genomes_vectorized
+    else:
+        evaluate = eval_genomes
+    try:
+        winner = p.run(evaluate, 50)  # number of generations
+    finally:
+        if evaluator is not None:
+            evaluator.close()
 
     # Save the winning model
     with open("winner.pkl", "wb") as f:
@@ -0,0 +1,179 @@
+import numpy as np
+from SnakeGame import BLOCK_SIZE
+
+# Direction codes in clockwise order, matching SnakeGameAI._move:
+# 0 = right, 1 = down, 2 = left, 3 = up
+DX = np.array([1, 0, -1, 0])
+DY = np.array([0, 1, 0, -1])
+
+STATE_SIZE = 11
+
+
+class SnakeBatchEnv:
+    """N headless Snake boards stepped in lockstep with NumPy.
+
+    Mirrors the rules of SnakeGameAI on a grid of cells: actions are
+    0 = straight, 1 = right turn, 2 = left turn (or the equivalent one-hot
+    rows), hitting a wall or the body ends the game with -10, eating gives
+    +10 and a board times out after 100 * len(snake) frames. A board whose
+    snake fills every cell ends after that last meal.
+
+    Every board places food from its own generator. With a seed they all
+    start from that seed, so each board gets the same food sequence
+    whatever the other boards do, as SnakeGameAI(seed=seed) would.
+
+    The body is stored as an occupancy grid of the frame each cell was
+    entered; a cell belongs to the snake while frame - grid < length, so
+    moving and growing never touch more than the new head cell.
+    """
+
+    def __init__(self, n, w=1000, h=800, seed=None, auto_reset=False, cols=None, rows=None):
+        self.n = n
+        # same board as SnakeGameAI(w, h, cols=cols, rows=rows)
+        self.cols = cols or w // BLOCK_SIZE
+        self.rows = rows or h // BLOCK_SIZE
+        self.auto_reset = auto_reset
+        seeds = [seed] * n if seed is not None else np.random.SeedSequence().spawn(n)
+        self.rngs = [np.random.default_rng(board_seed) for board_seed in seeds]
+
+        self.head_x = np.zeros(n, dtype=np.int64)
+        self.head_y = np.zeros(n, dtype=np.int64)
+        self.direction = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.food_x = np.zeros(n, dtype=np.int64)
+        self.food_y = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.frame_iteration = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        # frame at which each cell was last entered by a head
+        self.grid = np.zeros((n, self.rows, self.cols), dtype=np.int64)
+        self.reset()
+
+    def reset(self, idx=None):
+        if idx is None:
+            idx = np.arange(self.n)
+        idx = np.asarray(idx)
+        if idx.dtype == bool:
+            idx = np.flatnonzero(idx)
+        if idx.size == 0:
+            return self.get_state()
+
+        x0 = self.cols // 2
+        y0 = self.rows // 2
+        self.head_x[idx] = x0
+        self.head_y[idx] = y0
+        self.direction[idx] = 0
+        self.length[idx] = 3
+        self.score[idx] = 0
+        self.frame_iteration[idx] = 0
+        self.done[idx] = False
+
+        # the three starting cells were entered at frames 0, -1 and -2
+        self.grid[idx] = np.iinfo(np.int64).min // 2
+        for age in range(3):
+            self.grid[idx, y0, x0 - age] = -age
+
+        self._place_food(idx)
+        return self.get_state()
+
+    def occupied(self, idx=None):
+        # Boolean (k, rows, cols) mask of snake cells for the given boards
+        if idx is None:
+            idx = np.arange(self.n)
+        frame = self.frame_iteration[idx, None, None]
+        return frame - self.grid[idx] < self.length[idx, None, None]
+
+    def _place_food(self, idx):
+        # pick a uniformly random free cell on each board in idx, drawing
+        # one key per cell from the board's own generator; returns a mask
+        # of the boards that had no free cell left
+        free = ~self.occupied(idx).reshape(len(idx), -1)
+        keys = np.stack([self.rngs[i].random(free.shape[1]) for i in idx])
+        cell = np.where(free, keys, -1.0).argmax(axis=1)
+        full = ~free.any(axis=1)
+        self.food_x[idx[~full]] = cell[~full] % self.cols
+        self.food_y[idx[~full]] = cell[~full] // self.cols
+        return full
+
+    def _is_collision(self, idx, x, y):
+        # wall or body (tail included) at cell (x, y) on boards idx
+        out = (x < 0) | (x >= self.cols) | (y < 0) | (y >= self.rows)
+        xc = np.clip(x, 0, self.cols - 1)
+        yc = np.clip(y, 0, self.rows - 1)
+        age = self.frame_iteration[idx] - self.grid[idx, yc, xc]
+        return out | (age < self.length[idx])
+
+    def step(self, actions):
+        """Advance every running board by one frame.
+
+        Returns (state, reward, done, score); boards that are already done
+        are left untouched and get a reward of 0 until they are reset.
+        """
+        actions = np.asarray(actions)
+        if actions.ndim == 2:
+            actions = actions.argmax(axis=1)
+
+        reward = np.zeros(self.n, dtype=np.float64)
+        idx = np.flatnonzero(~self.done)
+        if idx.size:
+            self._step(idx, actions[idx], reward)
+
+        state = self.get_state()
+        done = self.done.copy()
+        score = self.score.copy()
+        if self.auto_reset and done.any():
+            state = self.reset(done)
+        return state, reward, done, score
+
+    def _step(self, idx, actions, reward):
+        turn = np.where(actions == 1, 1, np.where(actions == 2, -1, 0))
+        direction = (self.direction[idx] + turn) % 4
+        x = self.head_x[idx] + DX[direction]
+        y = self.head_y[idx] + DY[direction]
+        self.direction[idx] = direction
+        self.head_x[idx] = x
+        self.head_y[idx] = y
+
+        # checked before the frame advances so the tail still counts as body
+        dead = self._is_collision(idx, x, y)
+        self.frame_iteration[idx] += 1
+        dead |= self.frame_iteration[idx] > 100 * (self.length[idx] + 1)
+        reward[idx[dead]] = -10
+        self.done[idx[dead]] = True
+
+        alive = idx[~dead]
+        xa = x[~dead]
+        ya = y[~dead]
+        self.grid[alive, ya, xa] = self.frame_iteration[alive]
+
+        ate = (xa == self.food_x[alive]) & (ya == self.food_y[alive])
+        eaten = alive[ate]
+        if eaten.size:
+            self.length[eaten] += 1
+            self.score[eaten] += 1
+            reward[eaten] = 10
+            # the board is full, nothing left to eat
+            self.done[eaten[self._place_food(eaten)]] = True
+
+    def get_state(self):
+        """The 11-feature NEAT observation for every board, as an (n, 11) array."""
+        idx = np.arange(self.n)
+        d = self.direction
+        hx = self.head_x
+        hy = self.head_y
+        state = np.empty((self.n, STATE_SIZE), dtype=np.float64)
+        # danger straight, right, left
+        for col, turn in enumerate((0, 1, -1)):
+            probe = (d + turn) % 4
+            state[:, col] = self._is_collision(idx, hx + DX[probe], hy + DY[probe])
+        # move direction: left, right, up, down
+        state[:, 3] = d == 2
+        state[:, 4] = d == 0
+        state[:, 5] = d == 3
+        state[:, 6] = d == 1
+        # food location: left, right, up, down
+        state[:, 7] = self.food_x < hx
+        state[:, 8] = self.food_x > hx
+        state[:, 9] = self.food_y < hy
+        state[:, 10] = self.food_y > hy
+        return state
@@ -1,8 +1,8 @@
+import os
 import pygame
 import random
 from enum import Enum
-from collections import namedtuple
-import numpy as np
+from collections import namedtuple, deque
 
 pygame.init()
 # font = pygame.font.Font('arial.ttf', 25)
@@ -17,6 +17,7 @@ class Direction(Enum):
     DOWN = 4
 
 
+# Points are grid cells; BLOCK_SIZE is only applied when drawing
 Point = namedtuple('Point', 'x, y')
 
 # rgb colors
@@ -28,60 +29,138 @@ BLACK = (0, 0, 0)
 
 BLOCK_SIZE = 60
 SPEED = 40
+# the food sprite sits next to this module, wherever the game is started from
+FOOD_IMAGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'apple.png')
+
+# [straight, right, left] turns index into this, with the cell step for each
+CLOCK_WISE = [Direction.RIGHT, Direction.DOWN, Direction.LEFT, Direction.UP]
+CLOCK_WISE_INDEX = {d: i for i, d in enumerate(CLOCK_WISE)}
+STEPS = [(1, 0), (0, 1), (-1, 0), (0, -1)]
 
 
 class SnakeGameAI:
+    _food_image = None
+
+    def __init__(self, w=1000, h=800, headless=False, cols=None, rows=None, detect_loops=False, seed=None):
+        # board size in cells, by default as many as fit in a w x h window
+        self.cols = cols or w // BLOCK_SIZE
+        self.rows = rows or h // BLOCK_SIZE
+        self.w = self.cols * BLOCK_SIZE if cols else w
+        self.h = self.rows * BLOCK_SIZE if rows else h
+        # headless games never open a window, load images or tick the clock;
+        # they only draw when render() is called explicitly
+        self.headless = headless
+        # end an episode as soon as a (direction, body) state repeats without
+        # food being eaten; only valid for agents that act deterministically
+        self.detect_loops = detect_loops
+        self.display = None
+        self.food_image = None
+        self.clock = None
+        if not headless:
+            self._init_display()
+        # food placement draws only from this game's generator, so a seed
+        # replays the same food sequence whatever else uses random
+        self.rng = random.Random(seed)
+        self.reset()
+
+    def _init_display(self):
+        # init display, reusing the window of an earlier game of the same size
+        self.display = pygame.display.get_surface()
+        if self.display is None or self.display.get_size() != (self.w, self.h):
+            self.display = pygame.display.set_mode((self.w, self.h))
+            pygame.display.set_caption('Snake')
+
+        # decoding apple.png is slow, so it is loaded once and shared by every game
+        if SnakeGameAI._food_image is None:
+            SnakeGameAI._food_image = pygame.transform.scale(pygame.image.load(FOOD_IMAGE_PATH), (BLOCK_SIZE, BLOCK_SIZE))
+        self.food_image = SnakeGameAI._food_image
+
+        # the grid never changes, so it is drawn once and blitted back over
+        # cells the snake leaves; a segment is likewise drawn once and stamped
+        self.background = pygame.Surface((self.w, self.h))
+        self.background.fill(BLACK)
+        for x in range(0, self.w, BLOCK_SIZE):
+            pygame.draw.line(self.background, (40, 40, 40), (x, 0), (x, self.h))  # Vertical lines
+        for y in range(0, self.h, BLOCK_SIZE):
+            pygame.draw.line(self.background, (40, 40, 40), (0, y), (self.w, y))  # Horizontal lines
+
+        self.segment = pygame.Surface((BLOCK_SIZE, BLOCK_SIZE))
+        self.segment.fill(BLUE1)  # Snake body
+        pygame.draw.rect(self.segment, BLUE2, pygame.Rect(4, 4, BLOCK_SIZE - 8, BLOCK_SIZE - 8))  # Snake inner part
 
-    def __init__(self, w=1000, h=800):
-        self.w = w
-        self.h = h
-        # init display
-        self.display = pygame.display.set_mode((self.w, self.h))
-        pygame.display.set_caption('Snake')
-        
-        self.food_image = pygame.image.load('apple.png')
-        self.food_image = pygame.transform.scale(self.food_image, (BLOCK_SIZE, BLOCK_SIZE))
-        
+        self._drawn = None
         self.clock = pygame.time.Clock()
-        self.reset()
 
-    def reset(self):
+    def reset(self, seed=None):
+        # reseeding replays the food sequence from the start; without a seed
+        # the generator carries on from the previous episode
+        if seed is not None:
+            self.rng.seed(seed)
+
         # init game state
         self.direction = Direction.RIGHT
 
-        self.head = Point(
-            (self.w // (2 * BLOCK_SIZE)) * BLOCK_SIZE,
-            (self.h // (2 * BLOCK_SIZE)) * BLOCK_SIZE
-        )
-        
-        self.snake = [self.head,
-                      Point(self.head.x - BLOCK_SIZE, self.head.y),
-                      Point(self.head.x - (2 * BLOCK_SIZE), self.head.y)]
+        self.head = Point(self.cols // 2, self.rows // 2)
+
+        self.snake = deque([self.head,
+                            Point(self.head.x - 1, self.head.y),
+                            Point(self.head.x - 2, self.head.y)])
+        # every segment except the head, for constant-time collision checks
+        self._body = set(self.snake)
+        self._body.discard(self.head)
+
+        # free cells and their index in the list, for constant-time food placement
+        self._free = [Point(x, y) for y in range(self.rows) for x in range(self.cols)]
+        self._free_index = {pt: i for i, pt in enumerate(self._free)}
+        for pt in self.snake:
+            self._occupy(pt)
 
         self.score = 0
         self.food = None
         self._place_food()
         self.frame_iteration = 0
 
+        # why the last episode ended: 'collision', 'timeout', 'loop' or 'board_full'
+        self.termination = None
+        # frame whose state the loop returned to, and the frame the timeout
+        # would have ended the looping episode on
+        self.loop_start = None
+        self.timeout_frame = None
+        if self.detect_loops:
+            self._start_segment()
+
+        # (frame, tail, food, score) as last put on screen; None repaints everything
+        self._drawn = None
+
+    def _occupy(self, pt):
+        # swap the cell with the last free cell and drop it
+        i = self._free_index.pop(pt)
+        last = self._free.pop()
+        if last != pt:
+            self._free[i] = last
+            self._free_index[last] = i
+
+    def _vacate(self, pt):
+        self._free_index[pt] = len(self._free)
+        self._free.append(pt)
+
     def _place_food(self):
-        while True:
-            x = random.randint(0, (self.w - BLOCK_SIZE) // BLOCK_SIZE) * BLOCK_SIZE
-            y = random.randint(0, (self.h - BLOCK_SIZE) // BLOCK_SIZE) * BLOCK_SIZE
-            self.food = Point(x, y)
-            if self.food not in self.snake:  # Ensure food does not overlap with the snake
-                break
+        # food is None once the snake covers the whole board
+        self.food = self.rng.choice(self._free) if self._free else None
 
     def play_step(self, action):
         self.frame_iteration += 1
         # 1. collect user input
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                quit()
+        if not self.headless:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    quit()
 
         # 2. move
+        self._body.add(self.snake[0])
         self._move(action)  # update the head
-        self.snake.insert(0, self.head)
+        self.snake.appendleft(self.head)
 
         # 3. check if game over
         reward = 0
@@ -89,130 +168,223 @@ class SnakeGameAI:
         if self.is_collision() or self.frame_iteration > 100 * len(self.snake):
             game_over = True
             reward = -10
+            self.termination = 'collision' if self.is_collision() else 'timeout'
             return reward, game_over, self.score
 
         # 4. place new food or just move
-        if self.head == self.food:
+        self._occupy(self.head)
+        ate = self.head == self.food
+        if ate:
             self.score += 1
             reward = 10
             self._place_food()
+            if self.food is None:
+                # the board is full, nothing left to eat
+                game_over = True
+                self.termination = 'board_full'
+                return reward, game_over, self.score
         else:
-            self.snake.pop()
+            tail = self.snake.pop()
+            self._body.discard(tail)
+            self._vacate(tail)
+
+        if self.detect_loops and ate:
+            self._start_segment()
+        elif self.detect_loops:
+            self._body_hash ^= hash(self.head) ^ hash(tail)
+            self._path.append(self.head)
+            key = self._state_key()
+            start = self._seen.get(key)
+            if start is not None and self._same_body(start):
+                # nothing but the frame counter can change from here on, so
+                # the episode would only end at the timeout
+                game_over = True
+                self.termination = 'loop'
+                self.loop_start = start
+                self.timeout_frame = 100 * (len(self.snake) + 1) + 1
+                return reward, game_over, self.score
+            self._seen[key] = self.frame_iteration
 
         # 5. update ui and clock
-        self._update_ui()
-        self.clock.tick(SPEED)
+        if not self.headless:
+            self._update_ui()
+            self.clock.tick(SPEED)
         # 6. return game over and score
         return reward, game_over, self.score
 
+    def _start_segment(self):
+        # Food only moves when eaten, so between meals the direction and the
+        # body pin down the state. The body is the last len(snake) cells of
+        # the path, which starts out as the body left by the last meal.
+        self._path = list(reversed(self.snake))
+        self._body_hash = 0
+        for pt in self.snake:
+            self._body_hash ^= hash(pt)
+        # state key -> frame it was last seen on
+        self._seen = {self._state_key(): self.frame_iteration}
+
+    def _state_key(self):
+        # cheap to update every frame but may collide, see _same_body
+        return CLOCK_WISE_INDEX[self.direction], self.head, self._body_hash
+
+    def _same_body(self, frame):
+        # compare the body on that frame with the current one cell by cell
+        length = len(self.snake)
+        end = len(self._path) - (self.frame_iteration - frame)
+        return self._path[end - length:end] == self._path[-length:]
+
+    def render(self):
+        # Draw the current frame on demand; opens the window on first use
+        if self.display is None:
+            self._init_display()
+        pygame.event.pump()
+        self._update_ui()
+
     def is_collision(self, pt=None):
         if pt is None:
             pt = self.head
         # hits boundary
-        if pt.x > self.w - BLOCK_SIZE or pt.x < 0 or pt.y > self.h - BLOCK_SIZE or pt.y < 0:
+        if pt.x >= self.cols or pt.x < 0 or pt.y >= self.rows or pt.y < 0:
             return True
         # hits itself
-        if pt in self.snake[1:]:
+        if pt in self._body:
             return True
 
         return False
 
     def _update_ui(self):
-        # Fill the background with black
-        self.display.fill(BLACK)  # Set background color to black
-
-        # Draw the grid
-        for x in range(0, self.w, BLOCK_SIZE):
-            pygame.draw.line(self.display, (40, 40, 40), (x, 0), (x, self.h))  # Vertical lines
-        for y in range(0, self.h, BLOCK_SIZE):
-            pygame.draw.line(self.display, (40, 40, 40), (0, y), (self.w, y))  # Horizontal lines
-
-        # Draw the snake using rectangles
-        for pt in self.snake:
-            pygame.draw.rect(self.display, BLUE1, pygame.Rect(pt.x, pt.y, BLOCK_SIZE, BLOCK_SIZE))  # Snake body
-            pygame.draw.rect(self.display, BLUE2, pygame.Rect(pt.x + 4, pt.y + 4, BLOCK_SIZE - 8, BLOCK_SIZE - 8))  # Snake inner part
-
-        # Draw the food using the food image
-        self.display.blit(self.food_image, (self.food.x, self.food.y))  # Draw food image
-
-        # Render the score
-        text = font.render("Score: " + str(self.score), True, WHITE)
-        self.display.blit(text, [0, 0])
-        pygame.display.flip()
+        if self._drawn is not None and self._drawn[0] == self.frame_iteration - 1:
+            self._update_changed_cells()
+        else:
+            # first frame, or frames were skipped: repaint the whole board
+            self.display.blit(self.background, (0, 0))
+            for pt in self.snake:
+                self.display.blit(self.segment, (pt.x * BLOCK_SIZE, pt.y * BLOCK_SIZE))
+            if self.food is not None:
+                self.display.blit(self.food_image, (self.food.x * BLOCK_SIZE, self.food.y * BLOCK_SIZE))
+
+            self._score_text = font.render("Score: " + str(self.score), True, WHITE)
+            self.display.blit(self._score_text, [0, 0])
+            pygame.display.flip()
+
+        self._drawn = (self.frame_iteration, self.snake[-1], self.food, self.score)
+
+    def _update_changed_cells(self):
+        # After one step only the new head, the vacated tail and the food
+        # can differ from the screen; redraw those cells and push just them
+        _, old_tail, old_food, old_score = self._drawn
+        dirty = {self.head, old_tail, old_food, self.food}
+
+        text_cells = self._cells_under(self._score_text.get_rect())
+        if self.score != old_score:
+            self._score_text = font.render("Score: " + str(self.score), True, WHITE)
+            # clear the old text along with the new one
+            text_cells.update(self._cells_under(self._score_text.get_rect()))
+        elif dirty.isdisjoint(text_cells):
+            text_cells = set()
+        # the antialiased text blends with what is under it, so every cell
+        # beneath it is repainted before it is drawn again
+        dirty |= text_cells
+
+        rects = [self._draw_cell(pt) for pt in dirty
+                 if pt is not None and 0 <= pt.x < self.cols and 0 <= pt.y < self.rows]
+        if text_cells:
+            self.display.blit(self._score_text, [0, 0])
+        pygame.display.update(rects)
+
+    def _cells_under(self, rect):
+        return {Point(x, y)
+                for x in range(rect.left // BLOCK_SIZE, (rect.right - 1) // BLOCK_SIZE + 1)
+                for y in range(rect.top // BLOCK_SIZE, (rect.bottom - 1) // BLOCK_SIZE + 1)}
+
+    def _draw_cell(self, pt):
+        rect = pygame.Rect(pt.x * BLOCK_SIZE, pt.y * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE)
+        self.display.blit(self.background, rect, rect)
+        if pt == self.head or pt in self._body:
+            self.display.blit(self.segment, rect)
+        elif pt == self.food:
+            self.display.blit(self.food_image, rect)
+        return rect
 
     def _move(self, action):
         # [straight, right, left]
+        idx = CLOCK_WISE_INDEX[self.direction]
 
-        clock_wise = [Direction.RIGHT, Direction.DOWN, Direction.LEFT, Direction.UP]
-        idx = clock_wise.index(self.direction)
-
-        if np.array_equal(action, [1, 0, 0]):
-            new_dir = clock_wise[idx]  # no change
-        elif np.array_equal(action, [0, 1, 0]):
-            next_idx = (idx + 1) % 4
-            new_dir = clock_wise[next_idx]  # right turn r -> d -> l -> u
+        if action[0] == 1:
+            pass  # no change
+        elif action[1] == 1:
+            idx = (idx + 1) % 4  # right turn r -> d -> l -> u
         else:  # [0, 0, 1]
-            next_idx = (idx - 1) % 4
-            new_dir = clock_wise[next_idx]  # left turn r -> u -> l -> d
-
-        self.direction = new_dir
-
-        x = self.head.x
-        y = self.head.y
-        if self.direction == Direction.RIGHT:
-            x += BLOCK_SIZE
-        elif self.direction == Direction.LEFT:
-            x -= BLOCK_SIZE
-        elif self.direction == Direction.DOWN:
-            y += BLOCK_SIZE
-        elif self.direction == Direction.UP:
-            y -= BLOCK_SIZE
+            idx = (idx - 1) % 4  # left turn r -> u -> l -> d
+
+        self.direction = CLOCK_WISE[idx]
+        dx, dy = STEPS[idx]
+        self.head = Point(self.head.x + dx, self.head.y + dy)
+
+
+def get_sensors(game):
+    # Cell-based sensors shared by every state encoding:
+    # danger straight/right/left, move direction left/right/up/down and
+    # food left/right/up/down, as 0/1 ints
+    head = game.head
+    idx = CLOCK_WISE_INDEX[game.direction]
+
+    danger = []
+    for turn in (0, 1, -1):  # straight, right, left
+        dx, dy = STEPS[(idx + turn) % 4]
+        danger.append(int(game.is_collision(Point(head.x + dx, head.y + dy))))
+
+    return danger + [
+        int(idx == 2),  # moving left
+        int(idx == 0),  # moving right
+        int(idx == 3),  # moving up
+        int(idx == 1),  # moving down
+        int(game.food.x < head.x),  # food left
+        int(game.food.x > head.x),  # food right
+        int(game.food.y < head.y),  # food up
+        int(game.food.y > head.y)   # food down
+    ]
 
-        self.head = Point(x, y)
 
 def get_state(game):
-    head = game.snake[0]
-    point_l = Point(head.x - BLOCK_SIZE, head.y)
-    point_r = Point(head.x + BLOCK_SIZE, head.y)
-    point_u = Point(head.x, head.y - BLOCK_SIZE)
-    point_d = Point(head.x, head.y + BLOCK_SIZE)
-
-    dir_l = game.direction == Direction.LEFT
-    dir_r = game.direction == Direction.RIGHT
-    dir_u = game.direction == Direction.UP
-    dir_d = game.direction == Direction.DOWN
-
-    # Check for danger
-    danger_straight = (dir_r and game.is_collision(point_r)) or \
-                      (dir_l and game.is_collision(point_l)) or \
-                      (dir_u and game.is_collision(point_u)) or \
-                      (dir_d and game.is_collision(point_d))
-
-    danger_right = (dir_u and game.is_collision(point_r)) or \
-                   (dir_d and game.is_collision(point_l)) or \
-                   (dir_l and game.is_collision(point_u)) or \
-                   (dir_r and game.is_collision(point_d))
-
-    danger_left = (dir_d and game.is_collision(point_r)) or \
-                  (dir_u and game.is_collision(point_l)) or \
-                  (dir_r and game.is_collision(point_u)) or \
-                  (dir_l and game.is_collision(point_d))
-
-    # Check food location
-    food_up = game.food.y < head.y
-    food_down = game.food.y > head.y
-    food_left = game.food.x < head.x
-    food_right = game.food.x > head.x
+    sensors = get_sensors(game)
 
     # Create the state list
-    state = [
-        danger_straight,  # 1 if there's a body or wall straight ahead
-        danger_right,     # 1 if there's danger to the right
-        danger_left,      # 1 if there's danger to the left
-        food_up,          # 1 if food is above
-        food_down,        # 1 if food is below
-        food_left,        # 1 if food is to the left
-        food_right        # 1 if food is to the right
+    return [
+        sensors[0],   # 1 if there's a body or wall straight ahead
+        sensors[1],   # 1 if there's danger to the right
+        sensors[2],   # 1 if there's danger to the left
+        sensors[9],   # 1 if food is above
+        sensors[10],  # 1 if food is below
+        sensors[7],   # 1 if food is to the left
+        sensors[8]    # 1 if food is to the right
     ]
 
-    return list(map(int, state))
+
+def benchmark_place_food(fills=(0.1, 0.5, 0.9, 0.99), number=2000):
+    # Compare free-cell placement with the old rejection sampling as the
+    # snake covers more of the board
+    import timeit
+
+    def rejection_place_food(game, taken):
+        while True:
+            pt = Point(random.randrange(game.cols), random.randrange(game.rows))
+            if pt not in taken:
+                return pt
+
+    for fill in fills:
+        game = SnakeGameAI(headless=True)
+        cells = len(game._free) + len(game.snake)
+        taken = set(game.snake)
+        for pt in random.sample(game._free, int(cells * fill) - len(game.snake)):
+            game._occupy(pt)
+            taken.add(pt)
+
+        t_free = timeit.timeit(game._place_food, number=number) / number
+        t_reject = timeit.timeit(lambda: rejection_place_food(game, taken), number=number) / number
+        print(f"{fill:>5.0%} of {cells} cells taken: free-cell index {t_free * 1e6:.2f} us, "
+              f"rejection sampling {t_reject * 1e6:.2f} us")
+
+
+if __name__ == '__main__':
+    benchmark_place_food()
@@ -0,0 +1,120 @@
+import time
+import numpy as np
+import torch
+from model import Linear_QNet, QTrainer
+from replay_buffer import ReplayBuffer
+from SnakeBatchEnv import SnakeBatchEnv, STATE_SIZE
+
+# Headless Snake boards stepped together; every env step collects NUM_ENVS transitions
+NUM_ENVS = 64
+HIDDEN_SIZE = 256
+LR = 0.001
+GAMMA = 0.9
+# Sync the target network every TARGET_UPDATE gradient updates (None to bootstrap from the online model)
+TARGET_UPDATE = 500
+
+MEMORY_SIZE = 1_000_000
+BATCH_SIZE = 1000
+# Wait for this many transitions before the first update
+LEARNING_STARTS = 10_000
+# Run UPDATES_PER_STEP gradient updates after every TRAIN_EVERY env steps
+TRAIN_EVERY = 1
+UPDATES_PER_STEP = 1
+
+# Epsilon-greedy exploration, decayed linearly over EPSILON_DECAY_STEPS env steps
+EPSILON_START = 1.0
+EPSILON_END = 0.01
+EPSILON_DECAY_STEPS = 20_000
+
+# Stop after TIME_BUDGET seconds of wall-clock time or MAX_STEPS env steps, whichever comes first
+TIME_BUDGET = 600
+MAX_STEPS = None
+REPORT_EVERY = 10  # seconds
+SEED = 0
+
+
+class Agent:
+    def __init__(self, num_envs=NUM_ENVS, seed=SEED):
+        self.env = SnakeBatchEnv(num_envs, seed=seed, auto_reset=True)
+        self.rng = np.random.default_rng(seed)
+        torch.manual_seed(seed)
+
+        self.model = Linear_QNet(STATE_SIZE, HIDDEN_SIZE, 3)
+        self.trainer = QTrainer(self.model, lr=LR, gamma=GAMMA, target_update=TARGET_UPDATE)
+        self.memory = ReplayBuffer(MEMORY_SIZE, STATE_SIZE, seed=seed)
+
+        self.env_steps = 0
+        self.updates = 0
+        self.n_games = 0
+        self.record = 0
+
+    def epsilon(self):
+        frac = min(1.0, self.env_steps / EPSILON_DECAY_STEPS)
+        return EPSILON_START + frac * (EPSILON_END - EPSILON_START)
+
+    def get_actions(self, state):
+        # one forward pass picks the greedy move for every board
+        with torch.no_grad():
+            q = self.model(torch.as_tensor(state, dtype=torch.float))
+        actions = q.argmax(dim=1).numpy()
+
+        explore = self.rng.random(len(actions)) < self.epsilon()
+        actions[explore] = self.rng.integers(0, 3, explore.sum())
+        return actions
+
+    def train_long_memory(self):
+        batch = self.memory.sample(BATCH_SIZE)
+        self.trainer.train_step(*batch)
+        self.updates += 1
+
+
+def train(time_budget=TIME_BUDGET, max_steps=MAX_STEPS):
+    agent = Agent()
+    state = agent.env.get_state()
+    scores = []
+
+    start = last_report = time.perf_counter()
+    last_steps = last_updates = 0
+    while True:
+        now = time.perf_counter()
+        if now - start >= time_budget or (max_steps is not None and agent.env_steps >= max_steps):
+            break
+
+        actions = agent.get_actions(state)
+        next_state, reward, done, score = agent.env.step(actions)
+        # done boards were already reset; their next state is never bootstrapped from
+        agent.memory.add_batch(state, actions, reward, next_state, done)
+        state = next_state
+        agent.env_steps += 1
+
+        for game_score in score[done]:
+            agent.n_games += 1
+            scores.append(game_score)
+            if game_score > agent.record:
+                agent.record = int(game_score)
+                agent.model.save()
+
+        if len(agent.memory) >= LEARNING_STARTS and agent.env_steps % TRAIN_EVERY == 0:
+            for _ in range(UPDATES_PER_STEP):
+                agent.train_long_memory()
+
+        if now - last_report >= REPORT_EVERY:
+            elapsed = now - last_report
+            env_rate = (agent.env_steps - last_steps) * agent.env.n / elapsed
+            update_rate = (agent.updates - last_updates) / elapsed
+            mean_score = np.mean(scores[-100:]) if scores else 0.0
+            print(f"Games {agent.n_games}, Record {agent.record}, Mean (last 100) {mean_score:.2f}, "
+                  f"Epsilon {agent.epsilon():.3f} | {env_rate:,.0f} env steps/s, {update_rate:,.1f} updates/s")
+            last_report = now
+            last_steps = agent.env_steps
+            last_updates = agent.updates
+
+    elapsed = time.perf_counter() - start
+    print(f"Finished after {elapsed:.0f}s: {agent.env_steps * agent.env.n:,} env steps "
+          f"({agent.env_steps * agent.env.n / elapsed:,.0f}/s), {agent.updates:,} updates "
+          f"({agent.updates / elapsed:,.1f}/s), {agent.n_games} games, record {agent.record}")
+    return agent
+
+
+if __name__ == '__main__':
+    train()
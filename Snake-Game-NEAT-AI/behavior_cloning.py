@@ -0,0 +1,124 @@
+import os
+import queue
+import threading
+import time
+import numpy as np
+import torch
+import torch.nn.functional as F
+from model import Linear_QNet
+from GameplayRecorder import load_gameplay, convert_json, unpack_states
+
+DATA_PATH = "gameplay_data.bin"
+JSON_PATH = "gameplay_data.json"
+HIDDEN_SIZE = 256
+LR = 0.001
+BATCH_SIZE = 1024
+EPOCHS = 20
+# Batches prepared ahead of the training loop by the loader thread
+PREFETCH = 8
+CHECKPOINT = "bc_model.pth"
+SEED = 0
+
+
+class BatchLoader:
+    """Yields shuffled (states, actions) tensor batches from a gameplay recording.
+
+    A background thread gathers and unpacks the next batches from the
+    memmapped records while the main thread trains on the current one, so
+    only PREFETCH batches are ever held in memory. An exception in the
+    loader thread is raised again in the loop consuming the batches.
+    """
+
+    _DONE = object()
+
+    def __init__(self, records, state_size, batch_size=BATCH_SIZE, prefetch=PREFETCH, seed=SEED):
+        self.records = records
+        self.state_size = state_size
+        self.batch_size = batch_size
+        self.prefetch = prefetch
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        batches = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        order = self.rng.permutation(len(self.records))
+
+        def load():
+            try:
+                for start in range(0, len(order), self.batch_size):
+                    if stop.is_set():
+                        return
+                    # sorted reads walk the file forwards; the batch is shuffled anyway
+                    chunk = self.records[np.sort(order[start:start + self.batch_size])]
+                    states = torch.from_numpy(unpack_states(chunk['state'], self.state_size).astype(np.float32))
+                    actions = torch.from_numpy(chunk['action'].astype(np.int64))
+                    batches.put((states, actions))
+            except Exception as error:
+                # not the end of the data: the consumer raises it
+                batches.put(error)
+            else:
+                batches.put(self._DONE)
+
+        loader = threading.Thread(target=load, daemon=True)
+        loader.start()
+        try:
+            while True:
+                batch = batches.get()
+                if batch is self._DONE:
+                    break
+                if isinstance(batch, Exception):
+                    raise batch
+                yield batch
+        finally:
+            # unblock the loader if training stopped early
+            stop.set()
+            while loader.is_alive():
+                try:
+                    batches.get_nowait()
+                except queue.Empty:
+                    loader.join(0.01)
+
+
+def train(data_path=DATA_PATH, epochs=EPOCHS):
+    if not os.path.exists(data_path):
+        convert_json(JSON_PATH, data_path)
+    records, state_size = load_gameplay(data_path)
+    if len(records) == 0:
+        raise ValueError("{0} holds no gameplay samples".format(data_path))
+
+    torch.manual_seed(SEED)
+    model = Linear_QNet(state_size, HIDDEN_SIZE, 3)
+    optimizer = torch.optim.Adam(model.parameters(), lr=LR)
+    loader = BatchLoader(records, state_size)
+
+    best_loss = float('inf')
+    for epoch in range(1, epochs + 1):
+        start = time.perf_counter()
+        total_loss = 0.0
+        correct = 0
+        for states, actions in loader:
+            logits = model(states)
+            loss = F.cross_entropy(logits, actions)
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+
+            total_loss += loss.item() * len(actions)
+            correct += (logits.argmax(dim=1) == actions).sum().item()
+
+        elapsed = time.perf_counter() - start
+        mean_loss = total_loss / len(loader)
+        print(f"Epoch {epoch}: loss {mean_loss:.4f}, accuracy {correct / len(loader):.1%}, "
+              f"{len(loader) / elapsed:,.0f} samples/s")
+
+        if mean_loss < best_loss:
+            best_loss = mean_loss
+            model.save(CHECKPOINT)
+    return model
+
+
+if __name__ == '__main__':
+    train()
@@ -0,0 +1,36 @@
+import os
+import random
+import neat
+import pytest
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "neat-config.txt")
+
+
+@pytest.fixture
+def make_config():
+    """The training config, optionally with mixed activations mutating in."""
+    def make(activations=('relu',)):
+        config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                                    neat.DefaultSpeciesSet, neat.DefaultStagnation, CONFIG_PATH)
+        genome_config = config.genome_config
+        genome_config.activation_options = list(activations)
+        genome_config.activation_mutate_rate = 0.5 if len(activations) > 1 else 0.0
+        return config
+    return make
+
+
+@pytest.fixture
+def make_genomes():
+    """n seeded genomes, each mutated a random number of times so the
+    networks differ in depth and width."""
+    def make(config, n=30, seed=0):
+        random.seed(seed)
+        genomes = []
+        for key in range(n):
+            genome = config.genome_type(key)
+            genome.configure_new(config.genome_config)
+            for _ in range(random.randint(0, 40)):
+                genome.mutate(config.genome_config)
+            genomes.append(genome)
+        return genomes
+    return make
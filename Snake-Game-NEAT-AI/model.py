@@ -2,6 +2,7 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 import torch.nn.functional as F
+import copy
 import os
 
 
@@ -26,18 +27,32 @@ class Linear_QNet(nn.Module):
 
 
 class QTrainer:
-    def __init__(self, model, lr, gamma):
+    def __init__(self, model, lr, gamma, target_update=None):
         self.lr = lr
         self.gamma = gamma
         self.model = model
         self.optimizer = optim.Adam(model.parameters(), lr=self.lr)
         self.criterion = nn.MSELoss()
 
+        # Optional frozen copy of the model used for the bootstrap targets,
+        # synced with the online model every target_update train steps
+        self.target_update = target_update
+        self.target_model = None
+        if target_update:
+            self.target_model = copy.deepcopy(model)
+            self.target_model.requires_grad_(False)
+        self.steps = 0
+
+    def sync_target(self):
+        if self.target_model is not None:
+            self.target_model.load_state_dict(self.model.state_dict())
+
     def train_step(self, state, action, reward, next_state, done):
-        state = torch.tensor(state, dtype=torch.float)
-        next_state = torch.tensor(next_state, dtype=torch.float)
-        action = torch.tensor(action, dtype=torch.long)
-        reward = torch.tensor(reward, dtype=torch.float)
+        state = torch.as_tensor(state, dtype=torch.float)
+        next_state = torch.as_tensor(next_state, dtype=torch.float)
+        action = torch.as_tensor(action, dtype=torch.long)
+        reward = torch.as_tensor(reward, dtype=torch.float)
+        done = torch.as_tensor(done, dtype=torch.bool)
         # (n, x)
 
         if len(state.shape) == 1:
@@ -46,24 +61,33 @@ class QTrainer:
             next_state = torch.unsqueeze(next_state, 0)
             action = torch.unsqueeze(action, 0)
             reward = torch.unsqueeze(reward, 0)
-            done = (done,)
+            done = torch.unsqueeze(done, 0)
+
+        # actions may be one-hot rows or plain indices
+        if len(action.shape) == 2:
+            action = torch.argmax(action, dim=1)
 
         # 1: predicted Q values with current state
         pred = self.model(state)
 
-        target = pred.clone()
-        for idx in range(len(done)):
-            Q_new = reward[idx]
-            if not done[idx]:
-                Q_new = reward[idx] + self.gamma * torch.max(self.model(next_state[idx]))
+        # 2: Q_new = r + y * max(next_predicted Q value) -> only do this if not done
+        # all next states go through the network in one forward pass
+        with torch.no_grad():
+            next_model = self.target_model if self.target_model is not None else self.model
+            next_q = next_model(next_state).max(dim=1).values
+            q_new = reward + self.gamma * next_q * (~done)
 
-            target[idx][torch.argmax(action[idx]).item()] = Q_new
+            # only the taken action's entry moves, the rest match pred
+            target = pred.detach().clone()
+            target[torch.arange(len(action)), action] = q_new
 
-        # 2: Q_new = r + y * max(next_predicted Q value) -> only do this if not done
-        # pred.clone()
-        # preds[argmax(action)] = Q_new
         self.optimizer.zero_grad()
         loss = self.criterion(target, pred)
         loss.backward()
 
         self.optimizer.step()
+
+        self.steps += 1
+        if self.target_update and self.steps % self.target_update == 0:
+            self.sync_target()
+        return loss.item()
@@ -0,0 +1,235 @@
+import os
+import numpy as np
+
+
+class SumTree:
+    """Binary tree of priorities stored in one flat array.
+
+    Leaves live at tree[capacity:], every parent holds the sum of its two
+    children, so tree[1] is the total priority. Updates and prefix-sum
+    lookups work on whole index arrays at once.
+    """
+
+    def __init__(self, capacity):
+        # round up to a power of two so every leaf sits at the same depth
+        self.capacity = 1 << max(0, int(capacity - 1).bit_length())
+        self.depth = self.capacity.bit_length() - 1
+        self.tree = np.zeros(2 * self.capacity, dtype=np.float64)
+
+    def total(self):
+        return self.tree[1]
+
+    def update(self, idx, priority):
+        node = np.asarray(idx, dtype=np.int64) + self.capacity
+        self.tree[node] = priority
+        for _ in range(self.depth):
+            # repeated parents just get the same sum written twice
+            node = node // 2
+            self.tree[node] = self.tree[2 * node] + self.tree[2 * node + 1]
+
+    def find(self, value):
+        # leaf index whose prefix-sum interval contains each value
+        value = np.array(value, dtype=np.float64)
+        node = np.ones(value.shape, dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * node
+            left_sum = self.tree[left]
+            go_right = value >= left_sum
+            value -= np.where(go_right, left_sum, 0.0)
+            node = left + go_right
+        return node - self.capacity
+
+
+class ReplayBuffer:
+    """Fixed-size ring of transitions backed by preallocated NumPy arrays.
+
+    The Snake states are 0/1 features, so they are stored as uint8: a
+    transition of two 11-feature states takes 29 bytes and a million of
+    them fit in under 30 MB. sample() gathers a batch with fancy indexing
+    and returns arrays ready for QTrainer.train_step.
+
+    With prioritized=True transitions are drawn in proportion to
+    priority ** alpha through a sum tree; sample() then also returns the
+    sampled indices and importance-sampling weights, and update_priorities()
+    takes the new TD errors for those indices.
+    """
+
+    def __init__(self, capacity, state_size=11, prioritized=False, alpha=0.6, beta=0.4, eps=1e-5, seed=None):
+        self.capacity = capacity
+        self.state_size = state_size
+        self.pos = 0
+        self.size = 0
+        self._allocate()
+        self.rng = np.random.default_rng(seed)
+
+        self.prioritized = prioritized
+        self.alpha = alpha
+        self.beta = beta
+        self.eps = eps
+        self.max_priority = 1.0
+        self.tree = SumTree(capacity) if prioritized else None
+
+    def _allocate(self):
+        self.states = np.zeros((self.capacity, self.state_size), dtype=np.uint8)
+        self.next_states = np.zeros((self.capacity, self.state_size), dtype=np.uint8)
+        self.actions = np.zeros(self.capacity, dtype=np.uint8)
+        self.rewards = np.zeros(self.capacity, dtype=np.float32)
+        self.dones = np.zeros(self.capacity, dtype=bool)
+
+    def __len__(self):
+        return self.size
+
+    def nbytes(self):
+        return (self.states.nbytes + self.next_states.nbytes + self.actions.nbytes
+                + self.rewards.nbytes + self.dones.nbytes)
+
+    def add(self, state, action, reward, next_state, done):
+        """Store one transition, or a batch when state is 2-D.
+
+        Actions may be indices or one-hot rows.
+        """
+        state = np.asarray(state)
+        if state.ndim == 1:
+            self.add_batch(state[None], np.asarray(action)[None], [reward], np.asarray(next_state)[None], [done])
+        else:
+            self.add_batch(state, action, reward, next_state, done)
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        actions = np.asarray(actions)
+        if actions.ndim == 2:
+            actions = actions.argmax(axis=1)
+        n = len(actions)
+        if n > self.capacity:
+            # only the newest capacity transitions would survive anyway
+            keep = slice(n - self.capacity, n)
+            return self.add_batch(np.asarray(states)[keep], actions[keep], np.asarray(rewards)[keep],
+                                  np.asarray(next_states)[keep], np.asarray(dones)[keep])
+
+        idx = (self.pos + np.arange(n)) % self.capacity
+        self.states[idx] = states
+        self.next_states[idx] = next_states
+        self.actions[idx] = actions
+        self.rewards[idx] = rewards
+        self.dones[idx] = dones
+        self.pos = (self.pos + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+        if self.prioritized:
+            # new transitions are sampled at least once before their error is known
+            self.tree.update(idx, self.max_priority ** self.alpha)
+
+    def sample(self, batch_size):
+        """Draw a batch of transitions.
+
+        Returns (states, actions, rewards, next_states, dones), plus
+        (indices, weights) in prioritized mode.
+        """
+        if self.size == 0:
+            raise ValueError("Cannot sample from an empty replay buffer")
+
+        if not self.prioritized:
+            idx = self.rng.integers(0, self.size, batch_size)
+            return self._gather(idx)
+
+        # one uniform draw inside each of batch_size equal slices of the total
+        total = self.tree.total()
+        bounds = np.arange(batch_size) * (total / batch_size)
+        values = bounds + self.rng.random(batch_size) * (total / batch_size)
+        idx = np.minimum(self.tree.find(values), self.size - 1)
+
+        probs = self.tree.tree[idx + self.tree.capacity] / total
+        weights = (self.size * probs) ** -self.beta
+        weights /= weights.max()
+        return self._gather(idx) + (idx, weights.astype(np.float32))
+
+    def update_priorities(self, idx, td_errors):
+        priorities = np.abs(np.asarray(td_errors, dtype=np.float64)) + self.eps
+        self.max_priority = max(self.max_priority, priorities.max())
+        self.tree.update(idx, priorities ** self.alpha)
+
+    def _gather(self, idx):
+        return (self.states[idx].astype(np.float32),
+                self.actions[idx].astype(np.int64),
+                self.rewards[idx],
+                self.next_states[idx].astype(np.float32),
+                self.dones[idx])
+
+
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('state_size', '<u4'),
+    ('capacity', '<u8'),
+    ('pos', '<u8'),
+    ('size', '<u8'),
+])
+HEADER_SIZE = 64
+MAGIC = b'SNAKERB1'
+VERSION = 1
+
+
+def record_dtype(state_size):
+    # packed fixed-width record: 2 * state_size + 6 bytes per transition
+    return np.dtype([
+        ('state', 'u1', (state_size,)),
+        ('next_state', 'u1', (state_size,)),
+        ('action', 'u1'),
+        ('reward', '<f4'),
+        ('done', '?'),
+    ])
+
+
+class MemmapReplayBuffer(ReplayBuffer):
+    """ReplayBuffer whose transitions live in a memory-mapped file.
+
+    The file is a 64-byte header (magic, version, state size, capacity,
+    ring position and fill) followed by capacity fixed-width records, so
+    the capacity is bounded by disk rather than RAM and the OS pages in
+    only what sampling touches. Opening an existing file resumes the ring
+    where it stopped; call flush() to persist it, e.g. next to the model
+    checkpoint. Prioritized sampling is not available for this store.
+    """
+
+    def __init__(self, path, capacity=None, state_size=11, seed=None):
+        self.path = path
+        if os.path.exists(path):
+            self.header = np.memmap(path, dtype=HEADER_DTYPE, mode='r+', shape=(1,))
+            header = self.header[0]
+            if header['magic'] != MAGIC or header['version'] != VERSION:
+                raise ValueError("{0} is not a replay buffer file".format(path))
+            if capacity is not None and capacity != header['capacity']:
+                raise ValueError("{0} holds {1} transitions, not {2}".format(path, header['capacity'], capacity))
+            if state_size != header['state_size']:
+                raise ValueError("{0} stores states of size {1}, not {2}".format(path, header['state_size'], state_size))
+            capacity = int(header['capacity'])
+        else:
+            if capacity is None:
+                raise ValueError("capacity is required to create a new replay buffer file")
+            with open(path, 'wb') as f:
+                f.truncate(HEADER_SIZE + capacity * record_dtype(state_size).itemsize)
+            self.header = np.memmap(path, dtype=HEADER_DTYPE, mode='r+', shape=(1,))
+            self.header[0] = (MAGIC, VERSION, state_size, capacity, 0, 0)
+
+        super().__init__(capacity, state_size, seed=seed)
+        self.pos = int(self.header[0]['pos'])
+        self.size = int(self.header[0]['size'])
+
+    def _allocate(self):
+        self.records = np.memmap(self.path, dtype=record_dtype(self.state_size), mode='r+',
+                                 offset=HEADER_SIZE, shape=(self.capacity,))
+        # field views write straight through to the mapped records
+        self.states = self.records['state']
+        self.next_states = self.records['next_state']
+        self.actions = self.records['action']
+        self.rewards = self.records['reward']
+        self.dones = self.records['done']
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        super().add_batch(states, actions, rewards, next_states, dones)
+        self.header[0]['pos'] = self.pos
+        self.header[0]['size'] = self.size
+
+    def flush(self):
+        # records first, so a saved header never points at unwritten data
+        self.records.flush()
+        self.header.flush()
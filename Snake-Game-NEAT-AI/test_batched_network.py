@@ -0,0 +1,50 @@
+import neat
+import numpy as np
+import pytest
+from BatchedNetwork import BatchedNetwork
+
+
+def reference_outputs(genomes, config, inputs):
+    return np.array([neat.nn.FeedForwardNetwork.create(genome, config).activate(list(x))
+                     for genome, x in zip(genomes, inputs)])
+
+
+@pytest.mark.parametrize('activations', [('relu',), ('relu', 'sigmoid', 'tanh', 'identity', 'clamped', 'gauss', 'abs')])
+def test_matches_feed_forward_network(make_config, make_genomes, activations):
+    config = make_config(activations)
+    genomes = make_genomes(config)
+    net = BatchedNetwork.create(genomes, config)
+    rng = np.random.default_rng(0)
+
+    for _ in range(10):
+        inputs = rng.integers(0, 2, (len(genomes), config.genome_config.num_inputs)).astype(float)
+        # a matmul may add the terms in another order than sum() does
+        np.testing.assert_allclose(net.activate(inputs), reference_outputs(genomes, config, inputs),
+                                   rtol=1e-9, atol=1e-9)
+
+
+def test_rows_select_the_live_genomes(make_config, make_genomes):
+    config = make_config()
+    genomes = make_genomes(config)
+    net = BatchedNetwork.create(genomes, config)
+    rows = np.array([1, 4, 5, 20])
+    inputs = np.random.default_rng(1).integers(0, 2, (len(rows), config.genome_config.num_inputs)).astype(float)
+
+    full = np.zeros((len(genomes), inputs.shape[1]))
+    full[rows] = inputs
+
+    # a genome's outputs do not depend on which other genomes are in the batch
+    np.testing.assert_array_equal(net.activate(inputs, rows), net.activate(full)[rows])
+    np.testing.assert_allclose(net.activate(inputs, rows),
+                               reference_outputs([genomes[i] for i in rows], config, inputs),
+                               rtol=1e-9, atol=1e-9)
+
+
+def test_rejects_unsupported_aggregation(make_config, make_genomes):
+    config = make_config()
+    genomes = make_genomes(config, n=2)
+    for node in genomes[1].nodes.values():
+        node.aggregation = 'max'
+
+    with pytest.raises(ValueError):
+        BatchedNetwork.create(genomes, config)
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+import torch
+from GameplayRecorder import RECORD_DTYPE
+from behavior_cloning import BatchLoader
+
+
+def make_records(n):
+    records = np.zeros(n, dtype=RECORD_DTYPE)
+    records['state'] = np.arange(n) % 128
+    records['action'] = np.arange(n) % 3
+    return records
+
+
+def test_every_record_is_served_once_per_epoch():
+    records = make_records(1000)
+    loader = BatchLoader(records, state_size=7, batch_size=64, prefetch=2)
+
+    for _ in range(2):
+        batches = list(loader)
+        actions = torch.cat([actions for _, actions in batches])
+        assert len(actions) == len(records)
+        assert sorted(actions.tolist()) == sorted(records['action'].tolist())
+        assert all(states.shape[1] == 7 for states, _ in batches)
+
+
+def test_loader_errors_reach_the_training_loop():
+    # no action field, so the loader thread fails on the first batch
+    records = np.zeros(100, dtype=[('state', 'u1')])
+    loader = BatchLoader(records, state_size=7, batch_size=16)
+
+    with pytest.raises(ValueError):
+        list(loader)
+
+
+def test_stopping_early_releases_the_loader():
+    loader = BatchLoader(make_records(10000), state_size=7, batch_size=16, prefetch=1)
+
+    for i, _ in enumerate(loader):
+        if i == 2:
+            break
+    # a second epoch still starts from a fresh loader thread
+    assert sum(len(actions) for _, actions in loader) == 10000
@@ -0,0 +1,39 @@
+import copy
+import random
+import neat
+import pytest
+from GenomeCompiler import compile_genome
+
+
+@pytest.mark.parametrize('activations', [('relu',), ('relu', 'sigmoid', 'tanh', 'identity')])
+def test_outputs_are_identical_to_feed_forward_network(make_config, make_genomes, activations):
+    config = make_config(activations)
+    rng = random.Random(1)
+    num_inputs = config.genome_config.num_inputs
+
+    for genome in make_genomes(config):
+        net = neat.nn.FeedForwardNetwork.create(genome, config)
+        activate = compile_genome(genome, config)
+        for _ in range(20):
+            inputs = [rng.randint(0, 1) for _ in range(num_inputs)]
+            # exactly equal, not just close
+            assert activate(inputs) == net.activate(inputs)
+
+
+def test_disabled_connections_are_left_out(make_config, make_genomes):
+    config = make_config()
+    genome, = make_genomes(config, n=1, seed=2)
+    for cg in genome.connections.values():
+        cg.enabled = False
+    inputs = [1] * config.genome_config.num_inputs
+
+    assert compile_genome(genome, config)(inputs) == neat.nn.FeedForwardNetwork.create(genome, config).activate(inputs)
+
+
+def test_equal_networks_share_a_compiled_function(make_config, make_genomes):
+    config = make_config()
+    genome, = make_genomes(config, n=1, seed=3)
+    twin = copy.deepcopy(genome)
+    twin.key = 1
+
+    assert compile_genome(twin, config) is compile_genome(genome, config)
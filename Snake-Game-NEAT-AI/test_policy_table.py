@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+import torch
+from model import Linear_QNet
+from PolicyTable import PolicyTable, NUM_STATES, NUM_ACTIONS, ONE_HOT
+
+
+def test_policy_takes_the_most_recorded_action():
+    counts = np.zeros((NUM_STATES, NUM_ACTIONS), dtype=np.int64)
+    counts[5] = [1, 4, 2]
+    table = PolicyTable(counts)
+
+    assert table.actions[5] == ONE_HOT[1]
+    # unseen states go straight
+    assert table.actions[6] == ONE_HOT[0]
+    assert table.coverage() == 1
+
+
+def test_warm_start_fits_the_table():
+    torch.manual_seed(0)
+    counts = np.zeros((NUM_STATES, NUM_ACTIONS), dtype=np.int64)
+    counts[np.arange(NUM_STATES), np.arange(NUM_STATES) % NUM_ACTIONS] = 50
+    model = PolicyTable(counts).warm_start(Linear_QNet(7, 32, 3), steps=300)
+
+    states = np.unpackbits(np.arange(NUM_STATES, dtype=np.uint8)[:, None], axis=1, bitorder='little')[:, :7]
+    with torch.no_grad():
+        predicted = model(torch.as_tensor(states, dtype=torch.float)).argmax(dim=1).numpy()
+    assert (predicted == np.arange(NUM_STATES) % NUM_ACTIONS).mean() > 0.9
+
+
+def test_warm_start_needs_samples():
+    with pytest.raises(ValueError):
+        PolicyTable().warm_start(Linear_QNet(7, 32, 3))
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from replay_buffer import MemmapReplayBuffer, ReplayBuffer
+
+
+def transitions(n, seed=0):
+    rng = np.random.default_rng(seed)
+    states = rng.integers(0, 2, (n + 1, 11))
+    actions = rng.integers(0, 3, n)
+    rewards = rng.normal(size=n).astype(np.float32)
+    dones = rng.random(n) < 0.1
+    return states[:-1], actions, rewards, states[1:], dones
+
+
+def fill(buffer, data):
+    # one at a time, the way the agent stores them
+    for transition in zip(*data):
+        buffer.add(*transition)
+
+
+def test_reopened_file_resumes_the_ring(tmp_path):
+    path = str(tmp_path / "replay.bin")
+    data = transitions(130)
+    buffer = MemmapReplayBuffer(path, capacity=100)
+    fill(buffer, data)
+    buffer.flush()
+    del buffer
+
+    reopened = MemmapReplayBuffer(path)
+    memory = ReplayBuffer(100)
+    fill(memory, data)
+
+    assert (reopened.capacity, reopened.pos, len(reopened)) == (100, 30, 100)
+    for name in ('states', 'next_states', 'actions', 'rewards', 'dones'):
+        np.testing.assert_array_equal(getattr(reopened, name), getattr(memory, name))
+
+    # new transitions go on from where the ring stopped
+    more = transitions(5, seed=1)
+    fill(reopened, more)
+    fill(memory, more)
+    assert reopened.pos == memory.pos == 35
+    np.testing.assert_array_equal(reopened.states, memory.states)
+
+
+def test_sampling_matches_in_memory_buffer(tmp_path):
+    data = transitions(50)
+    buffer = MemmapReplayBuffer(str(tmp_path / "replay.bin"), capacity=64, seed=3)
+    memory = ReplayBuffer(64, seed=3)
+    fill(buffer, data)
+    fill(memory, data)
+
+    for ours, theirs in zip(buffer.sample(32), memory.sample(32)):
+        np.testing.assert_array_equal(ours, theirs)
+
+
+def test_reopen_checks_the_file(tmp_path):
+    path = str(tmp_path / "replay.bin")
+    MemmapReplayBuffer(path, capacity=10).flush()
+
+    with pytest.raises(ValueError):
+        MemmapReplayBuffer(path, capacity=20)
+    with pytest.raises(ValueError):
+        MemmapReplayBuffer(path, state_size=12)
+    with pytest.raises(ValueError):
+        MemmapReplayBuffer(str(tmp_path / "missing.bin"))
+
+    not_a_buffer = tmp_path / "other.bin"
+    not_a_buffer.write_bytes(b"\0" * 200)
+    with pytest.raises(ValueError):
+        MemmapReplayBuffer(str(not_a_buffer))
@@ -0,0 +1,104 @@
+import random
+import numpy as np
+from SnakeGame import SnakeGameAI, get_sensors
+from SnakeBatchEnv import SnakeBatchEnv
+
+
+def copy_food(game, env, i=0):
+    # the two place food with different generators, so the env follows the game
+    env.food_x[i] = game.food.x
+    env.food_y[i] = game.food.y
+
+
+def test_matches_snake_game_ai():
+    rng = random.Random(0)
+    for episode in range(100):
+        game = SnakeGameAI(headless=True, seed=episode)
+        env = SnakeBatchEnv(1, seed=episode)
+        copy_food(game, env)
+
+        done = False
+        while not done:
+            np.testing.assert_array_equal(env.get_state()[0], get_sensors(game))
+            # mostly straight, so some games run long enough to eat
+            action = rng.choice([0, 0, 0, 1, 2])
+            one_hot = [0, 0, 0]
+            one_hot[action] = 1
+
+            reward, done, score = game.play_step(one_hot)
+            _, env_reward, env_done, env_score = env.step(np.array([action]))
+            assert (env_reward[0], env_done[0], env_score[0]) == (reward, done, score)
+            if not done:
+                copy_food(game, env)
+
+
+def test_boards_step_independently():
+    rng = random.Random(1)
+    n = 8
+    games = [SnakeGameAI(headless=True, cols=10, rows=8, seed=i) for i in range(n)]
+    env = SnakeBatchEnv(n, cols=10, rows=8, seed=0)
+    for i, game in enumerate(games):
+        copy_food(game, env, i)
+
+    while not env.done.all():
+        actions = np.array([rng.randrange(3) for _ in range(n)])
+        _, reward, done, score = env.step(actions)
+        for i, game in enumerate(games):
+            if game.termination is not None:
+                # finished boards are left alone until they are reset
+                assert done[i] and reward[i] == 0
+                continue
+            one_hot = [0, 0, 0]
+            one_hot[actions[i]] = 1
+            assert game.play_step(one_hot) == (reward[i], done[i], score[i])
+            if not done[i]:
+                copy_food(game, env, i)
+
+
+def test_auto_reset_restarts_finished_boards():
+    env = SnakeBatchEnv(2, cols=10, rows=8, seed=0, auto_reset=True)
+    # board 0 runs straight into the right wall, board 1 circles a 2 x 2 square
+    for _ in range(3):
+        _, _, done, _ = env.step(np.array([0, 1]))
+    assert not done.any()
+
+    for _ in range(10):
+        _, _, done, _ = env.step(np.array([0, 1]))
+        if done[0]:
+            break
+    assert done[0] and not done[1]
+    assert env.frame_iteration[0] == 0 and env.length[0] == 3 and not env.done[0]
+
+
+def test_food_does_not_depend_on_the_other_boards():
+    rng = random.Random(2)
+    actions = [[rng.randrange(3) for _ in range(4)] for _ in range(300)]
+    # restarted boards carry on with their generator, so the run sees several meals
+    env = SnakeBatchEnv(4, cols=10, rows=8, seed=0, auto_reset=True)
+    # every board starts from the same seed, so the same food
+    assert len(set(zip(env.food_x, env.food_y))) == 1
+
+    foods = []
+    meals = 0
+    for step in actions:
+        _, reward, done, _ = env.step(np.array(step))
+        foods.append((env.food_x.copy(), env.food_y.copy(), done))
+        meals += (reward == 10).sum()
+    assert meals > 0
+
+    for i in range(4):
+        alone = SnakeBatchEnv(1, cols=10, rows=8, seed=0, auto_reset=True)
+        for step, (food_x, food_y, done) in zip(actions, foods):
+            _, _, alone_done, _ = alone.step(np.array([step[i]]))
+            assert (alone.food_x[0], alone.food_y[0], alone_done[0]) == (food_x[i], food_y[i], done[i])
+
+
+def test_full_board_ends_the_game():
+    # on a 4 x 1 board the snake fills the last cell with its first meal
+    game = SnakeGameAI(headless=True, cols=4, rows=1, seed=0)
+    env = SnakeBatchEnv(1, cols=4, rows=1, seed=0)
+
+    assert game.play_step([1, 0, 0]) == (10, True, 1)
+    assert game.termination == 'board_full'
+    _, reward, done, score = env.step(np.array([0]))
+    assert (reward[0], done[0], score[0]) == (10, True, 1)
@@ -0,0 +1,97 @@
+import os
+import random
+import pygame
+from SnakeGame import SnakeGameAI, Point, get_sensors
+
+# render() opens a window; the dummy driver keeps it off screen
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+STRAIGHT = [1, 0, 0]
+RIGHT_TURN = [0, 1, 0]
+# three cells straight, then a right turn: a 4 x 4 lap of 16 frames
+LAP = [STRAIGHT] * 3 + [RIGHT_TURN]
+
+
+def play(game, actions):
+    # frame the episode ended on, or None if it is still running
+    for frame, action in enumerate(actions, 1):
+        _, done, _ = game.play_step(action)
+        if done:
+            return frame
+    return None
+
+
+def looping_game():
+    game = SnakeGameAI(headless=True, detect_loops=True, seed=0)
+    # out of the way of the lap, so the snake never eats
+    game.food = Point(0, 0)
+    return game
+
+
+def test_circling_snake_is_cut_short():
+    game = looping_game()
+    ended = play(game, LAP * 20)
+
+    assert game.termination == 'loop'
+    # the state after the first frame of a lap comes back one lap later,
+    # long before the timeout at 100 frames per segment
+    assert ended == 17
+    assert game.loop_start == 1
+    assert game.timeout_frame == 100 * (len(game.snake) + 1) + 1
+
+
+def test_timeout_frame_matches_undetected_episode():
+    detected = looping_game()
+    play(detected, LAP * 20)
+    game = SnakeGameAI(headless=True, seed=0)
+    game.food = Point(0, 0)
+
+    assert play(game, LAP * 200) == detected.timeout_frame
+    assert game.termination == 'timeout'
+
+
+def test_key_collision_is_not_a_loop(monkeypatch):
+    game = looping_game()
+    # every state now shares one key, so only the body comparison can
+    # tell them apart
+    monkeypatch.setattr(game, '_state_key', lambda: 0)
+
+    assert play(game, [STRAIGHT] * 5) is None
+    assert game.termination is None
+
+
+def test_eating_starts_a_new_segment():
+    game = looping_game()
+    game.food = Point(game.head.x + 1, game.head.y)
+
+    assert play(game, [STRAIGHT]) is None
+    assert game.score == 1
+    assert len(game.snake) == 4
+    # the lap repeats once the snake is past the meal
+    assert play(game, LAP * 20) is not None
+    assert game.termination == 'loop'
+
+
+def test_dirty_rects_match_full_repaint():
+    rng = random.Random(1)
+    frames = 0
+    for episode in range(4):
+        # a small board, so the snake eats, grows and runs under the score
+        game = SnakeGameAI(headless=True, cols=8, rows=6, seed=episode)
+        while True:
+            # avoid immediate danger to keep episodes going
+            safe = [i for i, danger in enumerate(get_sensors(game)[:3]) if not danger] or [0]
+            action = [0, 0, 0]
+            action[rng.choice(safe)] = 1
+            _, done, _ = game.play_step(action)
+            if done:
+                break
+
+            game.render()
+            incremental = pygame.image.tobytes(game.display, 'RGB')
+            # forget what was drawn, so the same frame is repainted from scratch
+            game._drawn = None
+            game.render()
+            assert pygame.image.tobytes(game.display, 'RGB') == incremental
+            frames += 1
+    assert frames > 0